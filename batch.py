@@ -0,0 +1,151 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from file_cache import read_file_bytes
+from monthly_returns import group_returns, merge_groups, summarize_returns
+from tradebook_loader import parse_tradebook
+
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+# Function to expand directories and glob patterns into a sorted list of workbooks
+def find_workbooks(inputs, recursive=False):
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, '**', '*') if recursive else os.path.join(item, '*')
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=True)
+        paths.update(p for p in candidates if p.lower().endswith(WORKBOOK_EXTENSIONS) and os.path.isfile(p))
+    # Skip Excel lock files (~$name.xlsx)
+    return sorted(p for p in paths if not os.path.basename(p).startswith('~$'))
+
+
+# Function to build the per-category summary row of one set of returns
+def summary_row(returns):
+    row = {}
+    for category, result in (('Futures', returns.futures), ('Options', returns.options), ('Total', returns.total)):
+        row[f'{category} Trades'] = result.trades
+        row[f'{category} Overall (%)'] = result.overall
+        row[f'{category} Monthly GMR (%)'] = result.monthly_gmr
+        row[f'{category} Geometric Mean (%)'] = result.trade_gmr
+    if returns.net is not None:
+        for category, result in (('Futures', returns.net.futures), ('Options', returns.net.options),
+                                 ('Total', returns.net.total)):
+            row[f'{category} Net Geometric Mean (%)'] = result.trade_gmr
+    return row
+
+
+# Function to process one workbook: charges, trades and returns.
+# Runs in a worker process; errors are returned instead of raised so one bad file
+# does not stop the batch.
+def process_workbook(path):
+    started = time.perf_counter()
+    result = {'File': path, 'Bytes': 0, 'Rows': 0, 'Error': None, 'Groups': None, 'Summary': None}
+    try:
+        file_bytes = read_file_bytes(path)
+        result['Bytes'] = len(file_bytes)
+        charges_value, df = parse_tradebook(file_bytes)
+        result['Rows'] = len(df)
+
+        # Charges are allocated across the trades in the same aggregation pass
+        groups = group_returns(df, charges_value=charges_value)
+        result['Groups'] = groups
+        result['Summary'] = {'File': path, 'Charges': charges_value, **summary_row(summarize_returns(groups))}
+    except Exception as e:
+        result['Error'] = f"{type(e).__name__}: {e}"
+    result['Seconds'] = time.perf_counter() - started
+    return result
+
+
+# Function to flatten grouped returns into a long monthly table
+def monthly_table(groups):
+    table = groups.reset_index()
+    table['Expiry'] = table['Expiry'].astype(str)
+    table['Mean Return (%)'] = table['Sum'] / table['Trades']
+    table['Net Mean Return (%)'] = table['NetSum'] / table['Trades']
+    return table[['Category', 'Expiry', 'Trades', 'Mean Return (%)', 'Charges', 'Net Mean Return (%)', 'TotalLoss']]
+
+
+def _write(frame, output_dir, name, fmt):
+    path = os.path.join(output_dir, f'{name}.{fmt}')
+    if fmt == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+# Function to process many workbooks on a process pool and write the summaries.
+# Returns the list of per-file results.
+def run_batch(paths, output_dir, fmt='csv', workers=None, progress=sys.stderr):
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    results = []
+    total_bytes = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_workbook, path) for path in paths]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            total_bytes += result['Bytes']
+            elapsed = time.perf_counter() - started
+            status = 'ok' if result['Error'] is None else f"FAILED ({result['Error']})"
+            print(f"[{done}/{len(paths)}] {result['File']}: {status} in {result['Seconds']:.2f}s "
+                  f"- {done / elapsed:.1f} files/s, {total_bytes / elapsed / 1e6:.1f} MB/s",
+                  file=progress)
+
+    results.sort(key=lambda r: r['File'])
+    succeeded = [r for r in results if r['Error'] is None]
+    failed = [r for r in results if r['Error'] is not None]
+
+    # Per-file outputs
+    _write(pd.DataFrame([r['Summary'] for r in succeeded]), output_dir, 'summary_by_file', fmt)
+    monthly = [monthly_table(r['Groups']).assign(File=r['File']) for r in succeeded]
+    if monthly:
+        _write(pd.concat(monthly, ignore_index=True), output_dir, 'monthly_by_file', fmt)
+
+    # Combined outputs, merged from the per-file groups without revisiting any trades
+    combined_groups = merge_groups([r['Groups'] for r in succeeded])
+    combined = summarize_returns(combined_groups)
+    _write(pd.DataFrame([{'Files': len(succeeded), **summary_row(combined)}]), output_dir, 'summary_combined', fmt)
+    _write(monthly_table(combined_groups), output_dir, 'monthly_combined', fmt)
+
+    if failed:
+        _write(pd.DataFrame([{'File': r['File'], 'Error': r['Error']} for r in failed]), output_dir, 'errors', fmt)
+
+    elapsed = time.perf_counter() - started
+    rows = sum(r['Rows'] for r in succeeded)
+    print(f"Processed {len(results)} workbooks ({len(failed)} failed), {rows} trades, "
+          f"{total_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+          f"({len(results) / elapsed if elapsed else 0:.1f} files/s)", file=progress)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute F&O return summaries for many tradebook workbooks.")
+    parser.add_argument('inputs', nargs='+', help="Workbook files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='batch_output', help="Output directory (default: batch_output)")
+    parser.add_argument('-f', '--format', choices=['csv', 'parquet'], default='csv', help="Output format")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Search directories recursively")
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.inputs, args.recursive)
+    if not paths:
+        parser.error("no workbooks found")
+
+    results = run_batch(paths, args.output, args.format, args.workers)
+    return 1 if any(r['Error'] is not None for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
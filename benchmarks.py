@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from monthly_returns import aggregate_returns
+from stage2 import close_panel, screen_stage2
+from stage2_history import stage2_history
+from symbols import parse_symbols
+from synthetic_data import generate_price_panel, generate_trades, synthetic_charges, write_workbook
+from tradebook_loader import parse_tradebook
+from tradebook_schema import apply_schema
+from total_returns import calculate_total_returns
+
+BASELINE_PATH = 'benchmark_baseline.json'
+TRADE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TICKER_SIZES = [500, 3_000]
+
+# Workbooks go through openpyxl at roughly 0.2 ms per row, so writing and parsing a
+# 1M-row workbook would take minutes per timed run. Above this size the trades are cast
+# with apply_schema directly (the same frame parse_tradebook returns) and the
+# parse_workbook case is skipped; raise it with --max-workbook-trades.
+MAX_WORKBOOK_TRADES = 100_000
+# A benchmark slower than baseline by more than this factor is reported as a regression
+REGRESSION_THRESHOLD = 1.25
+
+
+# Function to time a callable: best and median wall time over repeats, and peak
+# traced memory of one extra (untimed) run
+def measure(func, repeats=3):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'peak_mb': peak / 1e6}
+
+
+# Function to build the benchmark cases: name -> zero-argument callable
+def build_cases(trade_sizes, ticker_sizes, max_workbook_trades=MAX_WORKBOOK_TRADES):
+    cases = {}
+    for n in trade_sizes:
+        trades = generate_trades(n)
+        if n <= max_workbook_trades:
+            workbook = write_workbook(trades)
+            charges, df = parse_tradebook(workbook)
+            cases[f'parse_workbook[{n}]'] = lambda workbook=workbook: parse_tradebook(workbook)
+        else:
+            charges, df = synthetic_charges(trades), apply_schema(trades)
+        cases[f'parse_symbols[{n}]'] = lambda df=df: parse_symbols(df['Symbol'])
+        cases[f'aggregate_returns[{n}]'] = lambda df=df: aggregate_returns(df)
+        # The full path: aggregation (gross and net of charges) plus the summary
+        cases[f'calculate_total_returns[{n}]'] = (
+            lambda df=df, charges=charges: calculate_total_returns(df, charges)
+        )
+
+    for n in ticker_sizes:
+        panel = generate_price_panel(n)
+        prices = {ticker: panel[[ticker]].rename(columns={ticker: 'Close'}) for ticker in panel.columns}
+        cases[f'close_panel[{n}]'] = lambda prices=prices: close_panel(prices)
+        cases[f'screen_stage2[{n}]'] = lambda panel=panel: screen_stage2(panel)
+        cases[f'stage2_history[{n}]'] = lambda panel=panel: stage2_history(panel)
+    return cases
+
+
+# Function to compare results against a saved baseline; returns the regressed benchmark names
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['best_s'] / baseline[name]['best_s'] if baseline[name]['best_s'] else float('inf')
+        result['vs_baseline'] = ratio
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the loader, aggregation and screener hot paths.")
+    parser.add_argument('--trades', type=int, nargs='+', default=TRADE_SIZES, help="Trade counts to benchmark")
+    parser.add_argument('--tickers', type=int, nargs='+', default=TICKER_SIZES, help="Ticker counts to benchmark")
+    parser.add_argument('--max-workbook-trades', type=int, default=MAX_WORKBOOK_TRADES,
+                        help="Largest trade count written to and parsed from a real workbook")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file to compare against / save to")
+    parser.add_argument('--save', action='store_true', help="Save the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    print("Generating synthetic data...", file=sys.stderr)
+    cases = build_cases(args.trades, args.tickers, args.max_workbook_trades)
+
+    results = {}
+    for name, func in cases.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeats)
+        print(f"{name:<36} best {results[name]['best_s'] * 1000:10.1f} ms   "
+              f"median {results[name]['median_s'] * 1000:10.1f} ms   peak {results[name]['peak_mb']:8.1f} MB")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for name in regressions:
+            print(f"REGRESSION {name}: {results[name]['vs_baseline']:.2f}x baseline")
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
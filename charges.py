@@ -1,30 +1,20 @@
 import streamlit as st
 import pandas as pd
-import openpyxl
+from table_view import paged_table
+from tradebook_loader import load_tradebook
+from instrumentation import timed
 
+# Function to load the workbook once and return the charges value with the trades, so
+# callers get both from one (cached) parse; the charges value is None when its row is missing
+@timed('charges.extract')
 def extract_charges(uploaded_file):
-    # Load the data, ensuring the Charges row is included
-    df_full = pd.read_excel(uploaded_file, sheet_name='F&O', engine='openpyxl', skiprows=13, header=None)
+    # The charges value is picked up while the F&O sheet is streamed by the tradebook loader
+    charges_value, df = load_tradebook(uploaded_file)
 
-    # Hiding Display - Only for Debug by Ash
-    # st.write("Relevant DataFrame section:")
-    # st.write(df_full.head(20))  # Display the first 20 rows for verification
-    
-    # Attempt to locate the row where "Charges" is located
-    charges_row = df_full[df_full.isin(['Charges']).any(axis=1)]
-    
-    # Check if the row was found and extract the value
-    if not charges_row.empty:
-        # Hiding Display - Only for Debug by Ash
-        # st.write("Charges row found (showing the first row only):")
-        # st.write(charges_row.head(1))  # Display only the first row
-        
-        # Assuming the value is in the third column
-        charges_value = charges_row.iloc[0, 2]  # Adjust if the charges value is in a different column
-        return charges_value
-    else:
+    # Check if the row was found
+    if charges_value is None:
         st.error("Charges row not found. Verify that 'Charges' is spelled correctly and present in the data.")
-        return None
+    return charges_value, df
 
 def main():
     st.title("Charges Extractor")
@@ -35,16 +25,13 @@ def main():
 
     if uploaded_file is not None:
         try:
-            # Display the raw data for verification
-            df = pd.read_excel(uploaded_file, sheet_name='F&O', engine='openpyxl', skiprows=13, header=None)
+            # Load the workbook once; the charges value and trades come from the same pass
+            charges_value, df = extract_charges(uploaded_file)
             st.write("Data preview:")
             st.write(df.head(20))  # Display the first 20 rows to inspect
             
-            # Extract and display the charges using the uploaded file
-            charges_value = extract_charges(uploaded_file)
-            
-            # Display the dataframe
-            st.write(df)
+            # Display the dataframe a page at a time
+            paged_table(df, key='charges')
             
             if charges_value is not None:
                 # Log the extracted charges value
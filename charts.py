@@ -0,0 +1,71 @@
+import functools
+import io
+
+import streamlit as st
+
+from instrumentation import count, span
+
+BACKENDS = ['matplotlib', 'vega']
+BAR_COLOR = 'skyblue'
+
+# Rendered charts kept in memory (each is a PNG of a few tens of KB)
+CACHE_SIZE = 32
+
+
+# Function to rasterise a bar chart with value labels to PNG bytes.
+# Uses a standalone Figure (not pyplot), so nothing is left in pyplot's global figure
+# registry; results are cached on the chart content so an unchanged chart is free.
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _render_png(labels, values, title, xlabel, ylabel):
+    from matplotlib.figure import Figure
+
+    # Only reached on a cache miss
+    count('chart.cache_misses')
+    fig = Figure(figsize=(12, 6))
+    try:
+        ax = fig.subplots()
+        bars = ax.bar(labels, values, color=BAR_COLOR)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.tick_params(axis='x', labelrotation=45)
+        # Add the return numbers on top of the bars
+        ax.bar_label(bars, labels=[f'{v:.2f}%' for v in values])
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+# Function to build a Vega-Lite bar chart spec with value labels, keeping the series order
+def _vega_spec(title, xlabel, ylabel):
+    x = {'field': 'label', 'type': 'nominal', 'sort': None, 'title': xlabel, 'axis': {'labelAngle': -45}}
+    y = {'field': 'value', 'type': 'quantitative', 'title': ylabel}
+    return {
+        'title': title,
+        'layer': [
+            {'mark': {'type': 'bar', 'color': BAR_COLOR}, 'encoding': {'x': x, 'y': y}},
+            {
+                'mark': {'type': 'text', 'dy': -6},
+                'encoding': {'x': x, 'y': y, 'text': {'field': 'value', 'type': 'quantitative', 'format': '.2f'}},
+            },
+        ],
+    }
+
+
+# Function to draw a bar chart of a labelled series (e.g. monthly returns plus Overall/GMR).
+# backend='matplotlib' shows a cached PNG; backend='vega' renders in the browser instead.
+def plot_bar_series(series, title, xlabel, ylabel, backend='matplotlib'):
+    labels = tuple(str(label) for label in series.index)
+    values = tuple(float(value) for value in series.to_numpy())
+    count('chart.requests')
+
+    if backend == 'vega':
+        data = {'values': [{'label': l, 'value': v} for l, v in zip(labels, values)]}
+        st.vega_lite_chart(data, _vega_spec(title, xlabel, ylabel), width='stretch')
+    else:
+        with span('chart.render'):
+            png = _render_png(labels, values, title, xlabel, ylabel)
+        st.image(png)
@@ -0,0 +1,20 @@
+import streamlit as st
+
+
+# Function to show the timings and counters of this run in a collapsible sidebar panel,
+# with the JSON export and, when a profiler ran, its dump as downloads
+def show_panel(recorder, dump=None):
+    with st.sidebar.expander("Performance (debug)"):
+        report = recorder.to_dict()
+        st.caption(f"Run took {report['wall_seconds'] * 1000:.0f} ms")
+        st.dataframe(recorder.spans_frame(), hide_index=True)
+        st.dataframe(recorder.counters_frame(), hide_index=True)
+        st.download_button(
+            "Download timings (JSON)", recorder.to_json(), file_name='timings.json',
+            mime='application/json', key='debug_timings',
+        )
+        if dump is not None and dump.data is not None:
+            st.download_button(
+                f"Download {dump.kind} profile", dump.data, file_name=dump.file_name,
+                mime=dump.mime, key='debug_profile',
+            )
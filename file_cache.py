@@ -0,0 +1,70 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Only the standard library is imported here, so the portfolio and tradebook loaders can
+# share it without pulling in each other's parsers (openpyxl, pyarrow)
+
+
+# Function to read the raw bytes of an uploaded file, a path or a file-like object
+def read_file_bytes(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        position = source.tell() if hasattr(source, 'tell') else None
+        data = source.read()
+        if position is not None:
+            source.seek(position)
+        return data
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+# Function to compute the content hash used as the cache key
+def file_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+# Function to hash a file on disk in blocks, without holding it in memory
+def path_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Least recently used cache of parsed files, keyed by content hash.
+# Streamlit runs each session on its own thread, so lookups, inserts and evictions are
+# locked; callers parse a missing file between get() and put(), outside the lock, so
+# sessions loading different files don't wait on each other.
+class LRUCache:
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Function to return the cached value (None when missing), marking it recently used
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    # Function to cache a value, dropping the least recently used one beyond size
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
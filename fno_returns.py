@@ -0,0 +1,136 @@
+import streamlit as st
+import pandas as pd
+from futures_monthly_returns import plot_futures_monthly_returns
+from options_monthly_returns import plot_options_monthly_returns
+from charges import extract_charges  # Charges value and trades of the workbook, timed as 'charges.extract'
+from symbols import parse_symbols  # Vectorized F&O contract symbol parser
+from monthly_returns import aggregate_returns  # One-pass futures/options/total returns aggregation
+from table_view import paged_table  # Paged, server-side filtered trade table
+from trade_store import TradeStore  # Local, deduplicated history of ingested tradebooks
+from total_returns import calculate_total_returns  # Import the calculate_total_returns function
+
+_trade_store = None
+
+
+# Function to return the shared local trade store, opened on first use
+def trade_store():
+    global _trade_store
+    if _trade_store is None:
+        _trade_store = TradeStore()
+    return _trade_store
+
+
+# Function to chart the monthly returns and show the total returns summary
+def show_returns(returns, charges_value, backend, net_of_charges):
+    charted = returns.net if net_of_charges and returns.net is not None else returns
+
+    # Plot Futures Monthly Returns
+    plot_futures_monthly_returns(charted, backend)
+
+    # Plot Options Monthly Returns
+    plot_options_monthly_returns(charted, backend)
+
+    # Calculate and summarize total returns
+    total_returns_df = calculate_total_returns(None, charges_value, returns)
+    st.write("Total Returns Summary:")
+    st.write(total_returns_df)
+
+
+# Function to show the trades and returns of one uploaded statement, saving it to the
+# local trade history when asked
+def statement_view(uploaded_file, backend, allocation, net_of_charges, save_history, show_statement_returns):
+    # Parse the workbook once (cached by content hash) for both the charges and the trades
+    charges_value, df = extract_charges(uploaded_file)
+    if charges_value is not None:
+        charges_table = pd.DataFrame({'Charges': [charges_value]})
+        st.write("Charges Table:")
+        st.write(charges_table)
+    else:
+        # extract_charges has reported the missing Charges row
+        return
+    # Handed to the trade store as parsed; it only reads the statement's own columns
+    tradebook = (charges_value, df)
+
+    # Parse the contract symbols once for every view below
+    parsed = parse_symbols(df['Symbol'])
+
+    # Add the "Month" column based on the "Symbol" column
+    df['Month'] = parsed['Expiry'].dt.strftime('%B').fillna('Unknown').astype('category')
+
+    # Reorder columns to place "Month" before "Symbol"
+    columns = ['Month'] + [col for col in df.columns if col != 'Month']
+    df = df[columns]
+
+    # Parsed contract fields, used as filters in the trade tables
+    df = df.join(parsed[['Underlying', 'Expiry', 'Instrument']])
+
+    # Separate futures and options data
+    futures_df = df[parsed['Instrument'] == 'FUT']
+    options_df = df[parsed['Instrument'].isin(['CE', 'PE'])]
+
+    # Display the dataframes a page at a time, filtered and sorted on the server
+    st.write("Futures Data:")
+    paged_table(futures_df, key='futures')
+    st.write("Options Data:")
+    paged_table(options_df, key='options')
+
+    if save_history:
+        # Only a statement not seen before is parsed into the store
+        new_trades, skipped = trade_store().ingest(uploaded_file, uploaded_file.name, allocation, tradebook)
+        if skipped:
+            st.info("This statement is already in the local trade history.")
+        else:
+            st.success(f"Added {new_trades} new trade(s) to the local trade history.")
+
+    if show_statement_returns:
+        # Aggregate gross and net futures, options and total returns in one pass, shared by the views below
+        returns = aggregate_returns(df, parsed, charges_value, allocation)
+        show_returns(returns, charges_value, backend, net_of_charges)
+
+
+# Function to show the returns over every trade in the local trade history.
+# Needs no upload: answered by aggregate queries over the store.
+def history_view(backend, net_of_charges):
+    files = trade_store().files()
+    st.subheader("Trade History")
+    if files.empty:
+        st.info("The local trade history is empty. Upload a statement with \"Save to local trade history\" ticked.")
+        return
+
+    st.write("Ingested Statements:")
+    st.write(files)
+    show_returns(trade_store().returns(), trade_store().total_charges(), backend, net_of_charges)
+
+
+# F&O Returns page
+def main():
+    st.title("Futures & Options Returns Calculator")
+    st.write("This app allows you to upload a single Excel file to view and analyze percentage returns for futures, options, and combined totals.")
+
+    # Native charts are drawn by the browser instead of being rasterised on the server
+    backend = 'vega' if st.sidebar.toggle("Native (Vega) charts") else 'matplotlib'
+
+    # Charges are split across trades by turnover or equally; the charts can show either figure
+    allocation = 'count' if st.sidebar.radio("Allocate charges by", ["Turnover", "Trade count"]) == "Trade count" else 'turnover'
+    net_of_charges = st.sidebar.radio("Charts show", ["Gross returns", "Net of charges"]) == "Net of charges"
+
+    # Uploaded statements can be kept in a local store and analysed together
+    save_history = st.sidebar.checkbox("Save to local trade history")
+    scope = st.sidebar.radio("Returns for", ["This statement", "Trade history"])
+
+    # File uploader for the data
+    uploaded_file = st.file_uploader("Choose an Excel file for the data", type=["xlsx", "xls"])
+
+    if uploaded_file is not None:
+        try:
+            statement_view(uploaded_file, backend, allocation, net_of_charges, save_history,
+                           show_statement_returns=scope == "This statement")
+        except Exception as e:
+            st.error(f"An error occurred while processing the file: {e}")
+
+    # The stored history is shown with or without an upload
+    if scope == "Trade history":
+        try:
+            history_view(backend, net_of_charges)
+        except Exception as e:
+            st.error(f"An error occurred while reading the trade history: {e}")
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+# Function to convert percentage returns to log growth, log(1 + r/100).
+# Returns (log_growth, total_loss): returns of -100% or worse cannot be logged, so they
+# contribute 0 to log_growth and are flagged in the total_loss mask instead.
+def log_growth(returns):
+    returns = np.asarray(returns, dtype='float64')
+    total_loss = returns <= -100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.log1p(np.where(total_loss, 0.0, returns) / 100)
+    return growth, total_loss
+
+
+# Log-space accumulator for geometric mean returns.
+# Holds the sum of log growth, the number of returns and whether any return was a total
+# loss. Accumulators built from separate chunks, months, accounts or files merge
+# associatively into the exact result for all of them, without keeping the raw returns.
+class GeometricAccumulator:
+    __slots__ = ('log_growth', 'count', 'total_loss')
+
+    def __init__(self, log_growth=0.0, count=0, total_loss=False):
+        self.log_growth = float(log_growth)
+        self.count = int(count)
+        self.total_loss = bool(total_loss)
+
+    # Function to build an accumulator from percentage returns (missing values are skipped)
+    @classmethod
+    def from_returns(cls, returns):
+        return cls().add(returns)
+
+    # Function to fold a chunk of percentage returns into the accumulator
+    def add(self, returns):
+        returns = np.asarray(returns, dtype='float64').ravel()
+        returns = returns[~np.isnan(returns)]
+        growth, total_loss = log_growth(returns)
+        self.log_growth += growth.sum()
+        self.count += len(returns)
+        self.total_loss = self.total_loss or bool(total_loss.any())
+        return self
+
+    # Function to combine two accumulators into a new one
+    def merge(self, other):
+        return GeometricAccumulator(
+            self.log_growth + other.log_growth,
+            self.count + other.count,
+            self.total_loss or other.total_loss,
+        )
+
+    __add__ = merge
+
+    # Function to return the geometric mean return in percent (NaN when empty)
+    def mean(self):
+        if self.count == 0:
+            return np.nan
+        if self.total_loss:
+            return -100.0
+        return np.expm1(self.log_growth / self.count) * 100
+
+    def __repr__(self):
+        return (f"GeometricAccumulator(log_growth={self.log_growth!r}, count={self.count!r}, "
+                f"total_loss={self.total_loss!r})")
+
+
+# Function to calculate the geometric mean of percentage returns
+def geometric_mean(returns):
+    return GeometricAccumulator.from_returns(returns).mean()
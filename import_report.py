@@ -0,0 +1,89 @@
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+
+from navigation import PAGES
+
+# Line format of python -X importtime: "import time: <self us> | <cumulative us> | <indent><module>"
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+APP_SCRIPT = 'streamlit_app.py'
+
+
+# Function to list the modules the app script imports at top level (besides streamlit).
+# These are loaded on every cold start, whichever page is opened.
+def shell_modules(script=APP_SCRIPT):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=script)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return [m for m in dict.fromkeys(modules) if m.split('.')[0] != 'streamlit']
+
+
+# Function to measure the import cost of one or more modules (comma separated) on top of
+# streamlit in a fresh interpreter.
+# Returns (total_ms, [(module, cumulative_ms), ...]) for the heaviest nested imports.
+def import_cost(module_name, top=8):
+    code = f"import streamlit\nimport {module_name}"
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            entries.append((name, len(indent) // 2, int(cumulative) / 1000))
+
+    # Entries printed after streamlit's own top-level line belong to the page module
+    start = max(i for i, (name, level, _) in enumerate(entries) if name == 'streamlit' and level == 0) + 1
+    page_entries = entries[start:]
+    total = sum(ms for _, level, ms in page_entries if level == 0)
+    # Direct dependencies of the page module, heaviest first
+    nested = sorted(((name, ms) for name, level, ms in page_entries if level == 1), key=lambda e: -e[1])
+    return total, nested[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the import time each app page adds on top of streamlit.")
+    parser.add_argument('--top', type=int, default=8, help="Heaviest imports listed per page")
+    parser.add_argument('--max-shell-ms', type=float, default=None,
+                        help="Exit with an error when the app shell imports take longer than this")
+    args = parser.parse_args(argv)
+
+    # The app shell (what streamlit_app.py imports before any page is chosen)
+    modules = shell_modules()
+    shell_total, nested = import_cost(', '.join(modules), args.top)
+    print(f"App shell ({', '.join(modules)}): {shell_total:.0f} ms")
+    for name, ms in nested:
+        print(f"    {name:<40} {ms:8.1f} ms")
+
+    for page, target in PAGES.items():
+        if target is None:
+            print(f"{page}: no page module")
+            continue
+        module_name = target[0]
+        total, nested = import_cost(module_name, args.top)
+        print(f"{page} ({module_name}): {total:.0f} ms")
+        for name, ms in nested:
+            print(f"    {name:<40} {ms:8.1f} ms")
+
+    if args.max_shell_ms is not None and shell_total > args.max_shell_ms:
+        sys.exit(f"App shell imports took {shell_total:.0f} ms (limit {args.max_shell_ms:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+# Instrumentation is off unless FUTURESROI_DEBUG is set; span() and count() are then
+# a flag check and a shared no-op context manager. Only the standard library is imported
+# at module level, since the app shell imports this module on every cold start.
+ENABLED = os.environ.get('FUTURESROI_DEBUG', '') not in ('', '0')
+
+# Profiler run around each page when debugging: 'cprofile' or 'pyinstrument'
+PROFILER = os.environ.get('FUTURESROI_PROFILE', '').lower()
+PROFILERS = ['cprofile', 'pyinstrument']
+
+_NULL_SPAN = contextlib.nullcontext()
+_current = contextvars.ContextVar('futuresroi_recorder', default=None)
+
+
+# Span timings and counters collected during one run (one Streamlit script run or one
+# batch call). Safe to update from worker threads.
+class Recorder:
+    def __init__(self):
+        self.started = time.time()
+        self.spans = {}  # name -> [calls, total seconds, max seconds]
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, elapsed):
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                self.spans[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+
+    def add(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # Function to return the span timings as a table, slowest first.
+    # pandas is imported here so the app shell does not load it unless debugging.
+    def spans_frame(self):
+        import pandas as pd
+
+        rows = [
+            {'Span': name, 'Calls': calls, 'Total (ms)': total * 1000, 'Max (ms)': longest * 1000}
+            for name, (calls, total, longest) in self.spans.items()
+        ]
+        frame = pd.DataFrame(rows, columns=['Span', 'Calls', 'Total (ms)', 'Max (ms)'])
+        return frame.sort_values('Total (ms)', ascending=False, ignore_index=True)
+
+    # Function to return the counters as a table
+    def counters_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(sorted(self.counters.items()), columns=['Counter', 'Value'])
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'started': self.started,
+                'wall_seconds': time.time() - self.started,
+                'spans': {
+                    name: {'calls': calls, 'total_seconds': total, 'max_seconds': longest}
+                    for name, (calls, total, longest) in self.spans.items()
+                },
+                'counters': dict(self.counters),
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.add_span(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# Function to turn instrumentation on or off for the process
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+# Function to start recording a new run in the current context.
+# Returns the Recorder, or None when instrumentation is disabled.
+def start_run():
+    if not ENABLED:
+        return None
+    recorder = Recorder()
+    _current.set(recorder)
+    return recorder
+
+
+# Function to return the Recorder of the current run (None outside a recorded run)
+def current():
+    return _current.get() if ENABLED else None
+
+
+# Function to time a block under name: with span('tradebook.parse'): ...
+def span(name):
+    if not ENABLED:
+        return _NULL_SPAN
+    recorder = _current.get()
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name)
+
+
+# Function to add n to a counter of the current run
+def count(name, n=1):
+    if ENABLED:
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.add(name, n)
+
+
+# Decorator timing every call of a function as a span
+def timed(name):
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Function to submit work to an executor so it records into the caller's run
+def submit(pool, func, *args, **kwargs):
+    return pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+# Profile of one run: data is filled in when the profiled block exits
+class ProfileDump:
+    def __init__(self, kind):
+        self.kind = kind
+        self.data = None
+        self.file_name = 'profile.prof' if kind == 'cprofile' else 'profile.html'
+        self.mime = 'application/octet-stream' if kind == 'cprofile' else 'text/html'
+
+
+# Function to profile a block with cProfile or pyinstrument (an optional dependency).
+# The cProfile dump loads with pstats or snakeviz; pyinstrument gives an HTML report.
+@contextlib.contextmanager
+def profile(kind='cprofile'):
+    if kind not in PROFILERS:
+        raise ValueError(f"Unknown profiler {kind!r}; expected one of {', '.join(PROFILERS)}")
+    dump = ProfileDump(kind)
+
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("pyinstrument profiling needs the 'pyinstrument' package") from e
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield dump
+        finally:
+            profiler.stop()
+            dump.data = profiler.output_html().encode('utf-8')
+    else:
+        import cProfile
+        import marshal
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield dump
+        finally:
+            profiler.disable()
+            # Same format as Profile.dump_stats, without going through a file
+            profiler.create_stats()
+            dump.data = marshal.dumps(profiler.stats)
+
@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from geometric import GeometricAccumulator, log_growth
+from instrumentation import count, span
+from symbols import parse_symbols
+
+RETURN_COLUMN = 'Realized P&L Pct.'
+
+# Instrument types reported under each category
+CATEGORY_BY_INSTRUMENT = {'FUT': 'Futures', 'CE': 'Options', 'PE': 'Options'}
+CATEGORIES = ['Futures', 'Options']
+
+# How the statement's charges are split across trades: pro rata by turnover
+# (buy + sell value) or equally per trade
+ALLOCATIONS = ['turnover', 'count']
+
+
+# Returns of one category (Futures, Options or Total)
+@dataclass
+class CategoryReturns:
+    monthly: pd.Series  # mean return (%) per expiry month, sorted PeriodIndex
+    overall: float  # arithmetic mean of the monthly returns (%)
+    monthly_gmr: float  # geometric mean of the monthly returns (%)
+    trade_gmr: float  # geometric mean over all trades (%)
+    trades: int
+
+
+# Futures, options and combined returns computed from one aggregation pass
+@dataclass
+class MonthlyReturns:
+    futures: CategoryReturns
+    options: CategoryReturns
+    total: CategoryReturns
+    net: 'MonthlyReturns' = None  # the same returns net of the allocated charges
+
+    # Function to build the per-category summary table
+    def summary(self):
+        summary = pd.DataFrame({
+            'Category': ['Futures', 'Options', 'Total'],
+            'Geometric Mean (%)': [self.futures.trade_gmr, self.options.trade_gmr, self.total.trade_gmr],
+        })
+        if self.net is not None:
+            summary['Net Geometric Mean (%)'] = [self.net.futures.trade_gmr, self.net.options.trade_gmr,
+                                                 self.net.total.trade_gmr]
+        return summary
+
+
+# Function to read a charges value that may be a number, text with thousands separators or missing
+def _charges_amount(charges_value):
+    if isinstance(charges_value, str):
+        charges_value = charges_value.replace(',', '').strip()
+    amount = pd.to_numeric(pd.Series([charges_value], dtype='object'), errors='coerce').iloc[0]
+    return 0.0 if pd.isna(amount) else float(amount)
+
+
+def _column(df, name):
+    if name in df.columns:
+        return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype='float64')
+    return np.full(len(df), np.nan)
+
+
+# Function to split the statement's charges across its trades in one vectorized step.
+# allocation='turnover' weighs trades by buy + sell value (equal weights when there is
+# no turnover to go by); allocation='count' charges every trade the same.
+def allocate_charges(df, charges_value, allocation='turnover'):
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Unknown allocation {allocation!r}; expected one of {', '.join(ALLOCATIONS)}")
+    amount = _charges_amount(charges_value)
+    if len(df) == 0 or amount == 0:
+        return pd.Series(0.0, index=df.index, name='Charges')
+
+    weights = np.ones(len(df))
+    if allocation == 'turnover':
+        turnover = np.nan_to_num(np.abs(_column(df, 'Buy Value'))) + np.nan_to_num(np.abs(_column(df, 'Sell Value')))
+        if turnover.sum() > 0:
+            weights = turnover
+    return pd.Series(amount * weights / weights.sum(), index=df.index, name='Charges')
+
+
+# Function to compute net-of-charges percentage returns.
+# Returns are P&L over buy value; when the buy value is missing it is recovered from the
+# P&L and the gross return, and trades with no usable base keep their gross return.
+def net_returns(df, returns, charges):
+    returns = np.asarray(returns, dtype='float64')
+    base = _column(df, 'Buy Value')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        implied = _column(df, 'Realized P&L') * 100 / returns
+        base = np.where(base > 0, base, np.abs(implied))
+        deduction = np.where(np.isfinite(base) & (base > 0), np.asarray(charges) * 100 / base, 0.0)
+    return returns - deduction
+
+
+# Function to compute the per-trade fields the aggregation works on: category, expiry
+# month, gross and net-of-charges return with their log growth / total-loss flags.
+# Pass parsed when parse_symbols was already run on df['Symbol']; without charges_value
+# the net figures equal the gross ones.
+def trade_returns(df, parsed=None, charges_value=None, allocation='turnover'):
+    if parsed is None:
+        parsed = parse_symbols(df['Symbol'])
+
+    returns = pd.to_numeric(df[RETURN_COLUMN], errors='coerce')
+    growth, total_loss = log_growth(returns)
+
+    charges = allocate_charges(df, charges_value, allocation)
+    net = net_returns(df, returns, charges)
+    net_growth, net_total_loss = log_growth(net)
+
+    return pd.DataFrame({
+        'Category': pd.Categorical(parsed['Instrument'].map(CATEGORY_BY_INSTRUMENT), categories=CATEGORIES),
+        'Expiry': parsed['Expiry'],
+        'Return': returns,
+        'Log Growth': growth,
+        'Total Loss': total_loss,
+        'Charges': charges,
+        'Net Return': net,
+        'Net Log Growth': net_growth,
+        'Net Total Loss': net_total_loss,
+    }, index=df.index)
+
+
+# Function to aggregate trades by (category, expiry month) in a single groupby.
+# Pass parsed when parse_symbols was already run on df['Symbol'], and charges_value to
+# get net-of-charges columns alongside the gross ones.
+def group_returns(df, parsed=None, charges_value=None, allocation='turnover'):
+    frame = trade_returns(df, parsed, charges_value, allocation).dropna(subset=['Category', 'Expiry', 'Return'])
+    count('returns.rows', len(frame))
+
+    with span('returns.groupby'):
+        return frame.groupby(['Category', 'Expiry'], observed=True).agg(
+            Trades=('Return', 'size'),
+            Sum=('Return', 'sum'),
+            LogGrowth=('Log Growth', 'sum'),
+            TotalLoss=('Total Loss', 'sum'),
+            Charges=('Charges', 'sum'),
+            NetSum=('Net Return', 'sum'),
+            NetLogGrowth=('Net Log Growth', 'sum'),
+            NetTotalLoss=('Net Total Loss', 'sum'),
+        )
+
+
+# Function to combine grouped returns from several chunks, accounts or files.
+# Every column is additive, so the merged groups give the exact combined results.
+def merge_groups(groups):
+    groups = [g for g in groups if not g.empty]
+    if not groups:
+        return group_returns(pd.DataFrame({'Symbol': [], RETURN_COLUMN: []}))
+    return pd.concat(groups).groupby(level=['Category', 'Expiry'], observed=True).sum()
+
+
+# Function to derive the returns of one category from its (expiry -> Trades/Sum/LogGrowth) rows.
+# prefix='Net' reads the net-of-charges columns instead.
+def _category_returns(groups, prefix=''):
+    groups = groups.sort_index()
+    monthly = groups[f'{prefix}Sum'] / groups['Trades']
+    # Months that net out to exactly zero are left out, as before
+    monthly = monthly[monthly != 0]
+    monthly.index = pd.PeriodIndex(monthly.index, freq='M')
+    monthly.name = RETURN_COLUMN
+
+    trades = GeometricAccumulator(
+        groups[f'{prefix}LogGrowth'].sum(), groups['Trades'].sum(), groups[f'{prefix}TotalLoss'].sum() > 0
+    )
+    return CategoryReturns(
+        monthly=monthly,
+        overall=monthly.mean(),
+        monthly_gmr=GeometricAccumulator.from_returns(monthly).mean(),
+        trade_gmr=trades.mean(),
+        trades=trades.count,
+    )
+
+
+# Function to turn grouped returns into futures, options and total results.
+# The net-of-charges results are read from the same groups when they carry them.
+def summarize_returns(groups, prefix=''):
+    empty = groups.iloc[0:0].droplevel('Category')
+    by_category = {
+        category: groups.xs(category, level='Category') if category in groups.index.get_level_values('Category') else empty
+        for category in CATEGORIES
+    }
+    total = groups.groupby(level='Expiry').sum()
+    return MonthlyReturns(
+        futures=_category_returns(by_category['Futures'], prefix),
+        options=_category_returns(by_category['Options'], prefix),
+        total=_category_returns(total, prefix),
+        net=summarize_returns(groups, 'Net') if not prefix and 'NetSum' in groups.columns else None,
+    )
+
+
+# Function to compute monthly, overall and geometric returns for futures, options and total,
+# gross and net of charges_value allocated across the trades
+def aggregate_returns(df, parsed=None, charges_value=None, allocation='turnover'):
+    return summarize_returns(group_returns(df, parsed, charges_value, allocation))
@@ -0,0 +1,16 @@
+import importlib
+
+# Sidebar pages and the (module, function) rendering each one.
+# Page modules are imported on first use, so opening Home does not pay for pandas,
+# matplotlib or yfinance.
+PAGES = {
+    "Home": None,
+    "Stage 2 Stocks": ("stage2", "stage2_page"),
+    "F&O Returns": ("fno_returns", "main"),
+}
+
+
+# Function to import a page's module and return its render function
+def load_page(page):
+    module_name, function_name = PAGES[page]
+    return getattr(importlib.import_module(module_name), function_name)
@@ -0,0 +1,229 @@
+import codecs
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from file_cache import LRUCache, file_hash, path_hash, read_file_bytes
+from instrumentation import count, span  # No-op unless FUTURESROI_DEBUG is set
+
+TICKER_COLUMN = 'Corrected Ticker'
+DATE_COLUMN = 'Date'
+# Only these columns of a portfolio export are read; both are required
+PORTFOLIO_COLUMNS = [TICKER_COLUMN, DATE_COLUMN]
+
+FORMATS = ['csv', 'xlsx', 'parquet']
+
+# Rows parsed per chunk, and bytes inspected to pick the CSV encoding
+CHUNK_ROWS = 100_000
+SNIFF_BYTES = 64 * 1024
+FALLBACK_ENCODING = 'ISO-8859-1'
+
+# Day zero of Excel serial dates
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+DATE_FORMAT = '%d/%m/%Y'
+
+# Number of loaded portfolios kept in memory
+CACHE_SIZE = 8
+
+_cache = LRUCache(CACHE_SIZE)
+
+
+# Function to detect the file format from the file name, falling back on the magic bytes
+def detect_format(prefix, name=None):
+    extension = os.path.splitext(name or '')[1].lower().lstrip('.')
+    if extension in FORMATS:
+        return extension
+    if prefix.startswith(b'PK'):
+        return 'xlsx'
+    if prefix.startswith(b'PAR1'):
+        return 'parquet'
+    return 'csv'
+
+
+# Function to choose the CSV encoding from a prefix of the file: a BOM if present,
+# else UTF-8 when the prefix decodes as UTF-8, else ISO-8859-1
+def sniff_encoding(prefix):
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # Incremental decoding tolerates a multi-byte character cut off at the end of the prefix
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+# Function to parse portfolio dates in one vectorized pass over the distinct values.
+# Numbers (or numeric text) are Excel serial dates, other text is dd/mm/yyyy and
+# datetime cells are kept; anything else becomes NaT.
+def parse_dates(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('datetime64[ns]')
+
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype='object')
+
+    serial = pd.to_numeric(uniques, errors='coerce')
+    is_datetime = uniques.map(lambda v: isinstance(v, (pd.Timestamp, np.datetime64)) or hasattr(v, 'isoformat'))
+    is_text = serial.isna() & ~is_datetime
+
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+    numeric = serial.notna()
+    parsed[numeric] = EXCEL_EPOCH + pd.to_timedelta(serial[numeric], unit='D')
+    if is_datetime.any():
+        parsed[is_datetime] = pd.to_datetime(uniques[is_datetime], errors='coerce')
+    if is_text.any():
+        text = uniques[is_text].astype(str).str.strip()
+        parsed[is_text] = pd.to_datetime(text, format=DATE_FORMAT, errors='coerce')
+
+    # Broadcast back to every row; missing values (code -1) become NaT
+    result = parsed.to_numpy().take(codes)
+    result[codes < 0] = np.datetime64('NaT')
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+# Function to tidy one chunk: stripped tickers and parsed dates
+def _finish_chunk(chunk):
+    chunk = chunk.rename(columns=lambda c: c.strip() if isinstance(c, str) else c)
+    result = pd.DataFrame(index=chunk.index)
+    result[TICKER_COLUMN] = chunk[TICKER_COLUMN].map(lambda v: v.strip() if isinstance(v, str) else v)
+    result[DATE_COLUMN] = parse_dates(chunk[DATE_COLUMN])
+    count('portfolio.rows', len(result))
+    return result
+
+
+def _wanted(column):
+    return isinstance(column, str) and column.strip() in PORTFOLIO_COLUMNS
+
+
+def _check_columns(columns):
+    stripped = [c.strip() for c in columns if isinstance(c, str)]
+    missing = [column for column in PORTFOLIO_COLUMNS if column not in stripped]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def _read_csv(handle, encoding):
+    reader = pd.read_csv(
+        handle, encoding=encoding, usecols=_wanted, dtype=str, chunksize=CHUNK_ROWS,
+        skipinitialspace=True,
+    )
+    chunks = []
+    for chunk in reader:
+        if not chunks:
+            _check_columns(chunk.columns)
+        chunks.append(_finish_chunk(chunk))
+    return chunks
+
+
+def _load_csv(open_file, prefix):
+    encoding = sniff_encoding(prefix)
+    try:
+        with open_file() as handle:
+            return _read_csv(handle, encoding)
+    except UnicodeDecodeError:
+        # Only reached when non-UTF-8 bytes appear after the sniffed prefix
+        with open_file() as handle:
+            return _read_csv(handle, FALLBACK_ENCODING)
+
+
+def _load_parquet(open_file):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet portfolios needs the 'pyarrow' package") from e
+
+    with open_file() as handle:
+        parquet = pq.ParquetFile(handle)
+        names = parquet.schema_arrow.names
+        _check_columns(names)
+        columns = [name for name in names if _wanted(name)]
+        return [
+            _finish_chunk(batch.to_pandas())
+            for batch in parquet.iter_batches(batch_size=CHUNK_ROWS, columns=columns)
+        ]
+
+
+def _load_xlsx(open_file):
+    import openpyxl
+
+    with open_file() as handle:
+        workbook = openpyxl.load_workbook(handle, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            sheet.reset_dimensions()
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return []
+            _check_columns(header)
+            positions = {c.strip(): i for i, c in enumerate(header) if _wanted(c)}
+
+            chunks = []
+            buffer = []
+            for row in rows:
+                buffer.append(tuple(row[i] if i < len(row) else None for i in positions.values()))
+                if len(buffer) == CHUNK_ROWS:
+                    chunks.append(_finish_chunk(pd.DataFrame(buffer, columns=list(positions), dtype='object')))
+                    buffer = []
+            if buffer or not chunks:
+                chunks.append(_finish_chunk(pd.DataFrame(buffer, columns=list(positions), dtype='object')))
+            return chunks
+        finally:
+            workbook.close()
+
+
+# Function to parse a portfolio export (CSV, XLSX or Parquet) into its ticker and date
+# columns. open_file returns a fresh binary file object; prefix is the start of the file.
+# Raises ValueError when a required column is missing.
+def parse_portfolio(open_file, prefix, name=None):
+    file_format = detect_format(prefix, name)
+    with span(f'portfolio.parse_{file_format}'):
+        if file_format == 'parquet':
+            chunks = _load_parquet(open_file)
+        elif file_format == 'xlsx':
+            chunks = _load_xlsx(open_file)
+        else:
+            chunks = _load_csv(open_file, prefix)
+
+    if not chunks:
+        return pd.DataFrame(columns=PORTFOLIO_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# Function to load the ticker and date columns of a portfolio export, cached by content hash.
+# source is an uploaded file, bytes, file-like object or path; name gives the file type
+# (defaults to the source's name) and the magic bytes are used when it is unknown.
+def load_portfolio(source, name=None):
+    if name is None:
+        name = getattr(source, 'name', source if isinstance(source, (str, os.PathLike)) else None)
+
+    if isinstance(source, (str, os.PathLike)):
+        # Large exports on disk are hashed and parsed in blocks
+        key = path_hash(source)
+        with open(source, 'rb') as f:
+            prefix = f.read(SNIFF_BYTES)
+        count('portfolio.bytes_read', os.path.getsize(source))
+        open_file = lambda: open(source, 'rb')
+    else:
+        file_bytes = read_file_bytes(source)
+        key = file_hash(file_bytes)
+        prefix = file_bytes[:SNIFF_BYTES]
+        count('portfolio.bytes_read', len(file_bytes))
+        open_file = lambda: io.BytesIO(file_bytes)
+
+    df = _cache.get(key)
+    if df is not None:
+        count('portfolio.cache_hits')
+    else:
+        count('portfolio.cache_misses')
+        df = parse_portfolio(open_file, prefix, name)
+        _cache.put(key, df)
+
+    # Hand out a copy so callers can drop rows without touching the cached frame
+    return df.copy()
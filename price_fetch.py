@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from instrumentation import count, span, submit
+
+# Defaults for the batched downloader
+BATCH_SIZE = 50
+MAX_WORKERS = 4
+TIMEOUT = 30
+RETRIES = 2
+BACKOFF = 1.0
+
+# Process-wide cap on in-flight provider requests, shared by every screener run
+MAX_CONCURRENT_REQUESTS = 4
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+# Raised by a provider when some tickers could not be downloaded. prices holds the
+# tickers that did come back and failed maps each missing ticker to its error.
+class MissingTickersError(Exception):
+    def __init__(self, prices, failed):
+        super().__init__(f"No price data returned for {', '.join(failed)}")
+        self.prices = prices
+        self.failed = failed
+
+
+# Function to build the errors of tickers that came back without data
+def no_data_errors(tickers):
+    return {ticker: LookupError(f"No price data returned for {ticker}") for ticker in tickers}
+
+
+# Base class for price providers.
+# download() takes a list of tickers and returns a dict of ticker -> daily OHLCV DataFrame.
+# Tickers without data are left out of the result, or reported by raising
+# MissingTickersError when the provider cannot tell them apart from failed downloads.
+class PriceProvider:
+    def download(self, tickers, period=None, start=None, end=None, interval='1d', timeout=TIMEOUT):
+        raise NotImplementedError
+
+
+# Provider backed by yfinance multi-symbol downloads.
+# yfinance logs failed tickers instead of raising and leaves them out of the result, so
+# tickers missing from the download are raised as MissingTickersError to be retried.
+class YFinanceProvider(PriceProvider):
+    def download(self, tickers, period=None, start=None, end=None, interval='1d', timeout=TIMEOUT):
+        import yfinance as yf
+
+        tickers = list(tickers)
+        # yfinance requests and keys its columns by the upper-cased symbol
+        symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        count('prices.network_calls')
+        count('prices.tickers_requested', len(symbols))
+        with span('prices.yfinance_download'):
+            data = yf.download(
+                symbols, period=period, start=start, end=end, interval=interval,
+                group_by='ticker', threads=False, progress=False, timeout=timeout,
+            )
+        result = split_download(data, tickers)
+        missing = [ticker for ticker in tickers if ticker not in result]
+        if missing:
+            raise MissingTickersError(result, no_data_errors(missing))
+        return result
+
+
+# Provider serving prices from local fixtures (for tests and benchmarks).
+# Fixtures are either given as a dict of ticker -> DataFrame or read from <directory>/<ticker>.csv.
+class FixtureProvider(PriceProvider):
+    def __init__(self, frames=None, directory=None):
+        self.frames = dict(frames or {})
+        self.directory = directory
+        self.calls = 0
+
+    def _frame(self, ticker):
+        if ticker not in self.frames and self.directory is not None:
+            path = os.path.join(self.directory, f"{ticker}.csv")
+            if os.path.exists(path):
+                self.frames[ticker] = pd.read_csv(path, index_col=0, parse_dates=True)
+        return self.frames.get(ticker)
+
+    def download(self, tickers, period=None, start=None, end=None, interval='1d', timeout=TIMEOUT):
+        self.calls += 1
+        result = {}
+        for ticker in tickers:
+            frame = self._frame(ticker)
+            if frame is None:
+                continue
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            elif period is not None:
+                frame = frame[frame.index > frame.index.max() - period_offset(period)]
+            if end is not None:
+                frame = frame[frame.index < pd.Timestamp(end)]
+            if not frame.empty:
+                result[ticker] = frame
+        return result
+
+
+# Function to convert a yfinance-style period ('1y', '6mo', '30d') to a DateOffset
+def period_offset(period):
+    if period.endswith('y'):
+        return pd.DateOffset(years=int(period[:-1]))
+    if period.endswith('mo'):
+        return pd.DateOffset(months=int(period[:-2]))
+    if period.endswith('d'):
+        return pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+# Function to split a yfinance group_by='ticker' download into per-ticker frames, keyed by
+# the tickers as requested (yfinance keys them upper-cased)
+def split_download(data, tickers):
+    result = {}
+    if data is None or data.empty:
+        return result
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Single ticker downloads may come back with flat columns
+        data = pd.concat({tickers[0]: data}, axis=1)
+
+    available = set(data.columns.get_level_values(0))
+    for ticker in tickers:
+        key = ticker if ticker in available else ticker.upper()
+        if key not in available:
+            continue
+        frame = data[key].dropna(how='all')
+        if not frame.empty:
+            frame.columns.name = None
+            result[ticker] = frame
+    return result
+
+
+# Function to download one batch, retrying failed tickers with exponential backoff.
+# Returns (prices, errors) like fetch_prices.
+def _download_batch(provider, batch, retries, backoff, **kwargs):
+    prices = {}
+    for attempt in range(retries + 1):
+        try:
+            with _request_slots:
+                prices.update(provider.download(batch, **kwargs))
+            return prices, {}
+        except MissingTickersError as e:
+            # Only the tickers that did not come back are requested again
+            prices.update(e.prices)
+            batch = [ticker for ticker in batch if ticker in e.failed]
+            errors = e.failed
+        except Exception as e:
+            errors = {ticker: e for ticker in batch}
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    return prices, errors
+
+
+# Function to fetch daily prices for many tickers using batched, concurrent requests.
+# Duplicate tickers are fetched once. Returns (prices, errors) where prices maps
+# ticker -> OHLCV DataFrame and errors maps ticker -> the exception of its last failed attempt.
+# on_batch(batch, batch_prices, batch_errors) is called as each batch completes, with the
+# tickers requested in it (tickers without data are in neither dict).
+def fetch_prices(tickers, provider=None, period='1y', start=None, end=None, interval='1d',
+                 batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, timeout=TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, on_batch=None):
+    provider = provider or YFinanceProvider()
+    unique_tickers = list(dict.fromkeys(t for t in tickers if isinstance(t, str) and t))
+    batches = [unique_tickers[i:i + batch_size] for i in range(0, len(unique_tickers), batch_size)]
+
+    prices = {}
+    errors = {}
+    if not batches:
+        return prices, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+        futures = {
+            submit(pool, _download_batch, provider, batch, retries, backoff,
+                        period=None if start is not None else period, start=start, end=end,
+                        interval=interval, timeout=timeout): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            batch_prices, batch_errors = future.result()
+            prices.update(batch_prices)
+            errors.update(batch_errors)
+            if on_batch is not None:
+                on_batch(batch, batch_prices, batch_errors)
+
+    return prices, errors
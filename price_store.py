@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pandas as pd
+
+from instrumentation import count, span
+from price_fetch import (
+    MissingTickersError, PriceProvider, YFinanceProvider, TIMEOUT, no_data_errors, period_offset,
+)
+
+# Location of the on-disk OHLC store
+STORE_PATH = os.environ.get(
+    'FUTURESROI_PRICE_STORE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'futuresroi', 'prices.sqlite'),
+)
+
+# Eviction policy: drop tickers not read for MAX_AGE_DAYS, then the least recently
+# read tickers until the store holds at most MAX_ROWS bars
+MAX_AGE_DAYS = 30
+MAX_ROWS = 5_000_000
+
+# Tickers that came back without data are not re-requested for this many seconds
+NO_DATA_TTL = 60 * 60
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 900
+
+COLUMN_MAP = {
+    'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close',
+    'Adj Close': 'adj_close', 'Volume': 'volume',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start TEXT NOT NULL,
+    last_date TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticker, interval)
+);
+"""
+
+
+def _chunks(items, size=_QUERY_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# SQLite-backed store of daily bars keyed by (ticker, interval, date).
+# Coverage rows record the earliest requested start and the last fetch time per ticker.
+class PriceStore:
+    def __init__(self, path=STORE_PATH, max_age_days=MAX_AGE_DAYS, max_rows=MAX_ROWS):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self._write_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # Function to return {ticker: (start, last_date, fetched_at)} for the stored tickers
+    def coverage(self, tickers, interval='1d'):
+        result = {}
+        with closing(self._connect()) as conn:
+            for chunk in _chunks(list(tickers)):
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT ticker, start, last_date, fetched_at FROM coverage "
+                    f"WHERE interval = ? AND ticker IN ({placeholders})",
+                    [interval, *chunk],
+                )
+                for ticker, start, last_date, fetched_at in rows:
+                    result[ticker] = (pd.Timestamp(start),
+                                      pd.Timestamp(last_date) if last_date else None,
+                                      fetched_at)
+        return result
+
+    # Function to merge freshly downloaded bars ({ticker: DataFrame}) into the store
+    def write(self, frames, start, interval='1d'):
+        now = time.time()
+        start = pd.Timestamp(start).strftime('%Y-%m-%d')
+
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            for ticker, frame in frames.items():
+                frame = frame.rename(columns=COLUMN_MAP).reindex(columns=list(COLUMN_MAP.values()))
+                dates = pd.DatetimeIndex(frame.index).strftime('%Y-%m-%d')
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(ticker, interval, date, *values)
+                     for date, values in zip(dates, frame.itertuples(index=False, name=None))],
+                )
+                last_date, rows = conn.execute(
+                    "SELECT MAX(date), COUNT(*) FROM bars WHERE ticker = ? AND interval = ?",
+                    (ticker, interval),
+                ).fetchone()
+                conn.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (ticker, interval) DO UPDATE SET "
+                    "start = MIN(start, excluded.start), last_date = excluded.last_date, "
+                    "fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at, "
+                    "rows = excluded.rows",
+                    (ticker, interval, start, last_date, now, now, rows),
+                )
+
+    # Function to read stored bars on or after start (and before end, if given)
+    def read(self, tickers, start, end=None, interval='1d'):
+        start = pd.Timestamp(start).strftime('%Y-%m-%d')
+        end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else '9999-12-31'
+        columns = ', '.join(COLUMN_MAP.values())
+        frames = []
+        with closing(self._connect()) as conn:
+            for chunk in _chunks(list(tickers)):
+                placeholders = ','.join('?' * len(chunk))
+                frames.append(pd.read_sql_query(
+                    f"SELECT ticker, date, {columns} FROM bars "
+                    f"WHERE interval = ? AND date >= ? AND date < ? AND ticker IN ({placeholders}) "
+                    f"ORDER BY ticker, date",
+                    conn, params=[interval, start, end, *chunk],
+                ))
+            with self._write_lock, conn:
+                for chunk in _chunks(list(tickers)):
+                    placeholders = ','.join('?' * len(chunk))
+                    conn.execute(
+                        f"UPDATE coverage SET accessed_at = ? WHERE interval = ? AND ticker IN ({placeholders})",
+                        [time.time(), interval, *chunk],
+                    )
+
+        bars = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        result = {}
+        if bars.empty:
+            return result
+        bars['date'] = pd.to_datetime(bars['date'])
+        bars = bars.rename(columns={v: k for k, v in COLUMN_MAP.items()})
+        for ticker, frame in bars.groupby('ticker', sort=False):
+            result[ticker] = frame.drop(columns='ticker').set_index('date').rename_axis('Date')
+        return result
+
+    # Function to keep the store bounded by age and by number of bars
+    def evict(self):
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            stale = conn.execute(
+                "SELECT ticker, interval FROM coverage WHERE accessed_at < ?", (cutoff,)
+            ).fetchall()
+
+            total = conn.execute(
+                "SELECT COALESCE(SUM(rows), 0) FROM coverage WHERE accessed_at >= ?", (cutoff,)
+            ).fetchone()[0]
+            if total > self.max_rows:
+                for ticker, interval, rows in conn.execute(
+                    "SELECT ticker, interval, rows FROM coverage WHERE accessed_at >= ? "
+                    "ORDER BY accessed_at", (cutoff,)
+                ).fetchall():
+                    if total <= self.max_rows:
+                        break
+                    stale.append((ticker, interval))
+                    total -= rows
+
+            conn.executemany("DELETE FROM bars WHERE ticker = ? AND interval = ?", stale)
+            conn.executemany("DELETE FROM coverage WHERE ticker = ? AND interval = ?", stale)
+        return len(stale)
+
+
+# Provider that serves bars from a PriceStore and only downloads the missing range.
+# Tickers already fetched today are served from disk; older ones are topped up from their
+# last stored bar. Only tickers that were actually downloaded are marked as fetched: if the
+# upstream provider fails, cached tickers are still served and the others are raised as
+# MissingTickersError, so fetch_prices retries them.
+class StoredPriceProvider(PriceProvider):
+    def __init__(self, provider=None, store=None):
+        self.provider = provider or YFinanceProvider()
+        self.store = store or PriceStore()
+
+    def download(self, tickers, period=None, start=None, end=None, interval='1d', timeout=TIMEOUT):
+        tickers = list(tickers)
+        now = time.time()
+        today = pd.Timestamp.today().normalize()
+        if start is not None:
+            start = pd.Timestamp(start)
+        else:
+            start = today - period_offset(period or '1y')
+
+        # Group tickers by the date their download has to start from
+        groups = {}
+        coverage = self.store.coverage(tickers, interval)
+        for ticker in tickers:
+            covered_from, last_date, fetched_at = coverage.get(ticker, (None, None, None))
+            if covered_from is None or covered_from > start:
+                groups.setdefault(start, []).append(ticker)
+            elif last_date is None:
+                if now - fetched_at >= NO_DATA_TTL:
+                    groups.setdefault(start, []).append(ticker)
+            elif pd.Timestamp(fetched_at, unit='s').normalize() >= today:
+                continue
+            else:
+                # Re-fetch the last stored bar too, it may have been a partial day
+                groups.setdefault(max(last_date, start), []).append(ticker)
+
+        failed = {}
+        for group_start, group in groups.items():
+            try:
+                fetched = self.provider.download(group, start=group_start, interval=interval, timeout=timeout)
+                group_failed = {}
+            except MissingTickersError as e:
+                fetched, group_failed = e.prices, e.failed
+            except Exception as e:
+                fetched, group_failed = {}, {ticker: e for ticker in group}
+            if not fetched:
+                # A group that comes back entirely empty is taken as an outage, not as
+                # tickers without data
+                failed.update(group_failed or no_data_errors(group))
+                continue
+            failed.update(group_failed)
+            # Tickers without data are recorded too, so they are not re-requested for NO_DATA_TTL
+            empty = pd.DataFrame(columns=list(COLUMN_MAP), index=pd.DatetimeIndex([]))
+            self.store.write(
+                {ticker: fetched.get(ticker, empty) for ticker in group if ticker not in group_failed},
+                group_start, interval,
+            )
+
+        if groups:
+            self.store.evict()
+
+        fetched_tickers = sum(len(group) for group in groups.values())
+        count('price_store.hits', len(tickers) - fetched_tickers)
+        count('price_store.misses', fetched_tickers)
+        with span('price_store.read'):
+            result = self.store.read(tickers, start, end, interval)
+        missing = {ticker: e for ticker, e in failed.items() if ticker not in result}
+        if missing:
+            # Nothing cached to fall back on for these
+            raise MissingTickersError(result, missing)
+        return result
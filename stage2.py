@@ -1,47 +1,129 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import yfinance as yf
-
-# Function to calculate simple moving averages
-def sma(data, window):
-    return data.rolling(window=window).mean()
-
-# Function to fetch historical data and calculate moving averages
-def fetch_moving_averages(ticker):
-    try:
-        # Fetch historical data for the past year
-        df_stock = yf.download(ticker, period="1y", interval="1d")
-        
-        # Calculate moving averages
-        sma50 = sma(df_stock['Close'], 50)
-        sma150 = sma(df_stock['Close'], 150)
-        sma200 = sma(df_stock['Close'], 200)
-        sma200_22 = sma200.shift(22)
-        
-        return sma50, sma150, sma200, sma200_22, df_stock['Close']
-    except Exception as e:
-        st.error(f"Error fetching data for {ticker}: {e}")
-        return None, None, None, None, None
+from portfolio_loader import load_portfolio  # Streaming CSV/XLSX/Parquet portfolio reader
+from price_store import StoredPriceProvider
+
+_price_provider = None
+
+# Function to return the shared price provider (yfinance behind the on-disk OHLC store)
+def price_provider():
+    global _price_provider
+    if _price_provider is None:
+        _price_provider = StoredPriceProvider()
+    return _price_provider
+
+# Moving average windows and the look-back used for the "trending" check
+SMA_WINDOWS = (50, 150, 200)
+TREND_LAG = 22
+
+# Bars needed before every criterion can be evaluated: SMA 200 plus its 22-day lag
+MIN_HISTORY = max(SMA_WINDOWS) + TREND_LAG
+
+# Price history requested per ticker (one year is not always enough for MIN_HISTORY)
+HISTORY_PERIOD = "2y"
+
+# Seconds between refreshes of the results table while a screen is running
+PROGRESS_INTERVAL = 1.0
+
+CRITERIA = [
+    'Price > MA 150 & 200',
+    'MA 150 > MA 200',
+    'MA 200 trending > 1 month',
+    'MA 50 > MA 150 & 200',
+]
+
+# Function to calculate several moving averages of a (dates x tickers) array in one pass.
+# A single cumulative sum serves every window; a window with any missing bar is NaN.
+def rolling_means(values, windows):
+    values = np.asarray(values, dtype='float64')
+    if values.ndim == 1:
+        values = values[:, None]
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, values.shape[1]))
+    csum = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    ccount = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+
+    means = {}
+    for window in windows:
+        result = np.full(values.shape, np.nan)
+        if window <= len(values):
+            sums = csum[window:] - csum[:-window]
+            counts = ccount[window:] - ccount[:-window]
+            result[window - 1:] = np.where(counts == window, sums / window, np.nan)
+        means[window] = result
+    return means
+
+# Function to evaluate the four Stage 2 criteria.
+# Works element-wise on scalars, Series, arrays or whole panels; NaN inputs give False.
+def stage2_criteria(close, sma50, sma150, sma200, sma200_22):
+    return {
+        'Price > MA 150 & 200': (close > sma150) & (close > sma200),
+        'MA 150 > MA 200': sma150 > sma200,
+        'MA 200 trending > 1 month': sma200 > sma200_22,
+        'MA 50 > MA 150 & 200': (sma50 > sma150) & (sma50 > sma200),
+    }
+
+# Function to build a wide (dates x tickers) close-price panel from per-ticker OHLC frames
+def close_panel(prices):
+    if not prices:
+        return pd.DataFrame()
+    panel = pd.concat({ticker: frame['Close'] for ticker, frame in prices.items()}, axis=1)
+    panel = panel.sort_index()
+    # Bridge gaps inside a ticker's history (e.g. exchange holidays of other tickers)
+    return panel.ffill(limit_area='inside')
+
+# Function to screen every ticker of a close-price panel as of its last bar.
+# Returns one row per ticker with the moving averages and boolean criteria columns.
+def screen_stage2(panel):
+    values = panel.to_numpy(dtype='float64')
+    n_dates, n_tickers = values.shape
+    means = rolling_means(values, SMA_WINDOWS)
+    sma50, sma150, sma200 = (means[w] for w in SMA_WINDOWS)
+    sma200_22 = np.full_like(sma200, np.nan)
+    sma200_22[TREND_LAG:] = sma200[:-TREND_LAG]
+
+    # Evaluate each ticker at its own last available bar
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    last = n_dates - 1 - np.argmax(valid[::-1], axis=0) if n_dates else np.zeros(n_tickers, dtype='int64')
+    columns = np.arange(n_tickers)
+
+    def at_last(array):
+        return np.where(has_data, array[last, columns], np.nan) if n_dates else np.full(n_tickers, np.nan)
+
+    close_last = at_last(values)
+    averages = [at_last(a) for a in (sma50, sma150, sma200, sma200_22)]
+    bars = valid.sum(axis=0)
+
+    results = pd.DataFrame({
+        'Ticker': panel.columns.astype(str),
+        'Close Price': close_last,
+        'SMA 50': averages[0],
+        'SMA 150': averages[1],
+        'SMA 200': averages[2],
+        'SMA 200 (22 bars ago)': averages[3],
+        'Bars': bars.astype('int64'),
+        'Enough History': bars >= MIN_HISTORY,
+    })
+    for name, passed in stage2_criteria(close_last, *averages).items():
+        results[name] = np.asarray(passed, dtype=bool)
+    results['Stage 2'] = results[CRITERIA].all(axis=1)
+    return results
 
 def stage2_analysis(uploaded_file):   
     if uploaded_file is not None:
         # Check if the file is empty
         if uploaded_file.size == 0:
-            st.error("Uploaded file is empty. Please upload a valid CSV or Excel file.")
+            st.error("Uploaded file is empty. Please upload a valid CSV, Excel or Parquet file.")
             st.stop()
 
         st.write(f"File name: {uploaded_file.name}")
         st.write(f"File size: {uploaded_file.size} bytes")
 
-        # Load the data based on file type
+        # Load only the ticker and date columns, in chunks, cached by content hash
         try:
-            if uploaded_file.name.endswith('.csv'):
-                try:
-                    df = pd.read_csv(uploaded_file, encoding='utf-8')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(uploaded_file, encoding='ISO-8859-1')
-            elif uploaded_file.name.endswith('.xlsx'):
-                df = pd.read_excel(uploaded_file)
+            df = load_portfolio(uploaded_file, uploaded_file.name)
 
             st.write(f"Loaded DataFrame shape: {df.shape}")
             st.write(f"First few rows of the DataFrame:")
@@ -58,68 +140,73 @@ def stage2_analysis(uploaded_file):
             st.error(f"An error occurred while reading the file: {e}")
             st.stop()
 
-        # Strip any leading or trailing spaces from column names
-        df.columns = df.columns.str.strip()
+        # Dates were resolved while loading (Excel serial numbers or dd/mm/yyyy)
+        if df['Date'].isnull().any():
+            st.warning("Some dates could not be parsed. Please check your data.")
+            df = df.dropna(subset=['Date'])
+
+        # Screen the tickers on a background thread; a screen of the same tickers that is
+        # running or finished recently is picked up again instead of being restarted
+        from stage2_jobs import start_job
+
+        tickers = df['Corrected Ticker'].dropna().astype(str).str.strip().unique()
+        job = start_job(tickers, provider=price_provider(), period=HISTORY_PERIOD)
+        if job.done:
+            show_stage2_results(job)
+        else:
+            stage2_progress(job)
+
+# Function to show the results of a running screen as batches complete.
+# Reruns on its own every PROGRESS_INTERVAL seconds and reruns the page once the screen is done.
+@st.fragment(run_every=PROGRESS_INTERVAL)
+def stage2_progress(job):
+    if job.done:
+        st.rerun()
+    total = len(job.tickers)
+    st.progress(job.completed / total if total else 1.0,
+                text=f"Downloading price history... {job.completed} of {total} tickers screened")
+    st.write(job.results())
+
+# Function to show the results of a finished screen; exports are built only when requested
+def show_stage2_results(job):
+    if job.status == 'failed':
+        st.error(f"Error screening the portfolio: {job.error}")
+        return
+
+    for ticker, e in job.errors.items():
+        st.error(f"Error fetching data for {ticker}: {e}")
 
-        # Handle the Date column, assuming it might contain Excel serial date numbers
-        try:
-            # Attempt to convert the Date column to integers first
-            df['Date'] = pd.to_numeric(df['Date'], errors='coerce').fillna(df['Date'])
-            # Now convert to datetime, handling Excel serial numbers and standard date formats
-            df['Date'] = pd.to_datetime(df['Date'], origin='1899-12-30', unit='D', errors='coerce').fillna(pd.to_datetime(df['Date'], format='%d/%m/%Y', errors='coerce'))
+    missing = [t for t in job.tickers if t not in job.prices and t not in job.errors]
+    if missing:
+        st.warning(f"Insufficient data to calculate moving averages for: {', '.join(missing)}")
 
-            if df['Date'].isnull().any():
-                st.warning("Some dates could not be parsed. Please check your data.")
-                df = df.dropna(subset=['Date'])
+    results_df = job.results()
+    short = results_df.loc[~results_df['Enough History'], 'Ticker']
+    if not short.empty:
+        st.warning(f"Not enough data points (need {MIN_HISTORY} bars) to fully evaluate: {', '.join(short)}")
 
-        except Exception as e:
-            st.error(f"Error parsing dates: {e}")
-            st.stop()
+    # Display the results including moving averages
+    st.subheader("Analysis Results for All Stocks")
+    st.write(results_df)
 
-        # Initialize a list to store results for each stock
-        results = []
-
-        # Loop through each stock to fetch data and check the conditions
-        for i, row in df.iterrows():
-            ticker = row['Corrected Ticker']
-
-            # Fetch historical data and calculate moving averages
-            sma50, sma150, sma200, sma200_22, close = fetch_moving_averages(ticker)
-
-            if sma50 is not None and not sma50.empty and not sma150.empty and not sma200.empty:
-                # Ensure the Series are long enough to access the last element
-                if len(close) > 0 and len(sma150) > 0 and len(sma200) > 0:
-                    # Criteria checks
-                    is_price_above_sma_150_and_200 = (close.iloc[-1] > sma150.iloc[-1]) & (close.iloc[-1] > sma200.iloc[-1])
-                    is_sma_150_above_sma_200 = (sma150.iloc[-1] > sma200.iloc[-1])
-                    is_trending_at_least_1_month = (sma200.iloc[-1] > sma200_22.iloc[-1]) if len(sma200_22) > 0 else False
-                    is_sma_50_above_sma_150_and_200 = (sma50.iloc[-1] > sma150.iloc[-1]) & (sma50.iloc[-1] > sma200.iloc[-1])
-
-                    # Store the result for this stock including the moving averages
-                    result = {
-                        'Ticker': ticker,
-                        'Close Price': close.iloc[-1],
-                        'SMA 50': sma50.iloc[-1],
-                        'SMA 150': sma150.iloc[-1],
-                        'SMA 200': sma200.iloc[-1],
-                        'Price > MA 150 & 200': 'Yes' if is_price_above_sma_150_and_200 else 'No',
-                        'MA 150 > MA 200': 'Yes' if is_sma_150_above_sma_200 else 'No',
-                        'MA 200 trending > 1 month': 'Yes' if is_trending_at_least_1_month else 'No',
-                        'MA 50 > MA 150 & 200': 'Yes' if is_sma_50_above_sma_150_and_200 else 'No',
-                    }
-                    results.append(result)
-                else:
-                    st.warning(f"Not enough data points to evaluate {ticker}.")
-            else:
-                st.warning(f"Insufficient data to calculate moving averages for {ticker}.")
-
-        # Convert results to a DataFrame for display
-        results_df = pd.DataFrame(results)
-        
-        # Display the results including moving averages
-        st.subheader("Analysis Results for All Stocks")
-        st.write(results_df)
-        
-        # Optionally, allow download of the results as a CSV file
-        csv = results_df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="Download Results as CSV", data=csv, file_name='analysis_results.csv', mime='text/csv')
+    # Optionally, allow download of the results; the file is generated when the button is clicked
+    from stage2_jobs import EXPORT_FORMATS
+
+    fmt = st.selectbox("Export format", list(EXPORT_FORMATS), format_func=str.upper)
+    st.download_button(label=f"Download Results as {fmt.upper()}", data=lambda: job.export(fmt),
+                       file_name=f'analysis_results.{fmt}', mime=EXPORT_FORMATS[fmt], on_click='ignore')
+
+    # Point-in-time mode: Stage 2 entries and exits over the downloaded history
+    if st.checkbox("Show Stage 2 history (entry/exit dates)"):
+        st.subheader("Stage 2 Episodes")
+        st.write(job.episodes())
+
+# Stage 2 Stocks page
+def stage2_page():
+    st.title("Stage 2 Stocks Analysis")
+    st.write("Analyze your portfolio for stocks meeting Stage 2 criteria.")
+
+    # File uploader for Stage 2 analysis
+    uploaded_file = st.file_uploader("Upload your portfolio file", type=["csv", "xlsx", "parquet"])
+    if uploaded_file is not None:
+        stage2_analysis(uploaded_file)
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from stage2 import SMA_WINDOWS, TREND_LAG, rolling_means, stage2_criteria
+
+# The running sums are rebuilt from the window buffer every RESYNC_BARS updates
+# so floating point drift cannot build up in long-lived states
+RESYNC_BARS = 250
+
+
+# Function to turn the criteria arrays of a panel into (dates x tickers) boolean frames,
+# including the combined 'Stage 2' frame
+def _criteria_frames(index, columns, close, sma50, sma150, sma200, sma200_22):
+    with np.errstate(invalid='ignore'):
+        criteria = stage2_criteria(close, sma50, sma150, sma200, sma200_22)
+    frames = {name: pd.DataFrame(np.asarray(passed, dtype=bool), index=index, columns=columns)
+              for name, passed in criteria.items()}
+    frames['Stage 2'] = pd.DataFrame(
+        np.logical_and.reduce([f.to_numpy() for f in frames.values()]), index=index, columns=columns
+    )
+    return frames
+
+
+# Function to compute the daily time series of every Stage 2 criterion over a close-price panel.
+# Returns {criterion: (dates x tickers) boolean DataFrame}, plus 'Stage 2' (all criteria met).
+def stage2_history(panel):
+    values = panel.to_numpy(dtype='float64')
+    means = rolling_means(values, SMA_WINDOWS)
+    sma50, sma150, sma200 = (means[w] for w in SMA_WINDOWS)
+    sma200_22 = np.full_like(sma200, np.nan)
+    sma200_22[TREND_LAG:] = sma200[:-TREND_LAG]
+    return _criteria_frames(panel.index, panel.columns, values, sma50, sma150, sma200, sma200_22)
+
+
+# Function to list every Stage 2 episode from a (dates x tickers) boolean frame.
+# Exit Date is the first bar out of Stage 2 (NaT while the episode is still running).
+def stage2_episodes(in_stage):
+    flags = in_stage.to_numpy(dtype=bool).astype(np.int8)
+    n_dates = len(flags)
+    edge = np.zeros((1, flags.shape[1]), dtype=np.int8)
+    # Transposed so the transitions come out grouped by ticker and ordered in time
+    changes = np.diff(np.concatenate([edge, flags, edge]), axis=0).T
+    tickers, starts = np.nonzero(changes == 1)
+    _, ends = np.nonzero(changes == -1)
+
+    dates = pd.DatetimeIndex(in_stage.index)
+    ongoing = ends >= n_dates
+    exit_dates = dates[np.minimum(ends, n_dates - 1)].to_numpy().copy()
+    exit_dates[ongoing] = np.datetime64('NaT')
+    last_dates = dates[ends - 1]
+
+    return pd.DataFrame({
+        'Ticker': in_stage.columns[tickers].astype(str),
+        'Entry Date': dates[starts],
+        'Exit Date': exit_dates,
+        'Bars in Stage': ends - starts,
+        'Days in Stage': (last_dates - dates[starts]).days + 1,
+        'Ongoing': ongoing,
+    })
+
+
+# Incremental Stage 2 state for a fixed set of tickers.
+# Keeps the last SMA 200 window of closes, running window sums and the last 22 SMA 200
+# values, so each new bar costs O(tickers) instead of recomputing the rolling means.
+class Stage2State:
+    def __init__(self, tickers, closes, sma200_lag, last_date, in_stage, entry_dates, bars_in_stage):
+        self.tickers = pd.Index(tickers)
+        self.last_date = pd.Timestamp(last_date)
+        self.in_stage = in_stage
+        self.entry_dates = entry_dates
+        self.bars_in_stage = bars_in_stage
+        # Ring buffers: closes of the last max(SMA_WINDOWS) bars and SMA 200 of the last TREND_LAG bars
+        self._closes = closes
+        self._sma200_lag = sma200_lag
+        self._position = 0
+        self._lag_position = 0
+        self._last_close = self._last_valid(closes)
+        self._resync()
+
+    # Function to build the state from a close-price panel (and its history, if already computed)
+    @classmethod
+    def from_panel(cls, panel, history=None):
+        window = max(SMA_WINDOWS)
+        values = panel.to_numpy(dtype='float64')
+        n_dates, n_tickers = values.shape
+
+        # Only the last window + lag bars are needed to seed the running sums
+        tail = values[-(window + TREND_LAG):]
+        sma200 = rolling_means(tail, [window])[window]
+        sma200_lag = np.full((TREND_LAG, n_tickers), np.nan)
+        sma200_lag[TREND_LAG - min(TREND_LAG, len(tail)):] = sma200[-TREND_LAG:]
+        closes = np.full((window, n_tickers), np.nan)
+        closes[window - min(window, n_dates):] = values[-window:]
+
+        # Current episode per ticker: entry is the bar after the last bar out of Stage 2
+        if history is None:
+            history = stage2_history(panel)
+        flags = history['Stage 2'].to_numpy(dtype=bool)
+        in_stage = flags[-1].copy() if n_dates else np.zeros(n_tickers, dtype=bool)
+        out_rev = (~flags[::-1]).argmax(axis=0)
+        all_in = flags.all(axis=0)
+        bars_in_stage = np.where(in_stage, np.where(all_in, n_dates, out_rev), 0)
+        entry_index = np.clip(n_dates - bars_in_stage, 0, max(n_dates - 1, 0))
+        entry_dates = np.where(in_stage, pd.DatetimeIndex(panel.index)[entry_index].to_numpy(),
+                               np.datetime64('NaT'))
+
+        return cls(panel.columns, closes, sma200_lag, panel.index[-1], in_stage,
+                   entry_dates.astype('datetime64[ns]'), bars_in_stage.astype('int64'))
+
+    @staticmethod
+    def _last_valid(values):
+        return pd.DataFrame(values).ffill().to_numpy()[-1] if len(values) else np.full(values.shape[1], np.nan)
+
+    # Function to rebuild the running sums exactly from the window buffer
+    def _resync(self):
+        window = len(self._closes)
+        # Oldest bar first
+        ordered = np.roll(self._closes, -self._position, axis=0)
+        valid = ~np.isnan(ordered)
+        filled = np.where(valid, ordered, 0.0)
+        self._sums = {w: filled[window - w:].sum(axis=0) for w in SMA_WINDOWS}
+        self._counts = {w: valid[window - w:].sum(axis=0) for w in SMA_WINDOWS}
+        self._since_resync = 0
+
+    # Function to feed new bars (a dates x tickers close frame after last_date).
+    # Returns the criteria frames for the new dates, like stage2_history.
+    def update(self, bars):
+        bars = bars[bars.index > self.last_date].sort_index()
+        bars = bars.reindex(columns=self.tickers)
+        window = len(self._closes)
+        rows = {name: [] for name in ('close', 'sma50', 'sma150', 'sma200', 'sma200_22')}
+
+        for values in bars.to_numpy(dtype='float64'):
+            # Carry the previous close over missing bars, as close_panel does
+            values = np.where(np.isnan(values), self._last_close, values)
+            valid = ~np.isnan(values)
+            incoming = np.where(valid, values, 0.0)
+            for w in SMA_WINDOWS:
+                leaving = self._closes[(self._position - w) % window]
+                leaving_valid = ~np.isnan(leaving)
+                self._sums[w] += incoming - np.where(leaving_valid, leaving, 0.0)
+                self._counts[w] += valid.astype(np.int64) - leaving_valid
+            self._closes[self._position] = values
+            self._position = (self._position + 1) % window
+            self._last_close = np.where(valid, values, self._last_close)
+
+            means = {w: np.where(self._counts[w] == w, self._sums[w] / w, np.nan) for w in SMA_WINDOWS}
+            sma200 = means[SMA_WINDOWS[-1]]
+            sma200_22 = self._sma200_lag[self._lag_position].copy()
+            self._sma200_lag[self._lag_position] = sma200
+            self._lag_position = (self._lag_position + 1) % TREND_LAG
+
+            for name, value in zip(rows, (values, means[50], means[150], sma200, sma200_22)):
+                rows[name].append(value)
+
+            self._since_resync += 1
+            if self._since_resync >= RESYNC_BARS:
+                self._resync()
+
+        shape = (len(bars), len(self.tickers))
+        arrays = [np.array(rows[name]).reshape(shape) for name in rows]
+        frames = _criteria_frames(bars.index, self.tickers, *arrays)
+
+        # Roll the current episodes forward
+        for date, flags in zip(bars.index, frames['Stage 2'].to_numpy()):
+            entering = flags & ~self.in_stage
+            self.entry_dates = np.where(entering, np.datetime64(date, 'ns'), self.entry_dates)
+            self.entry_dates = np.where(flags, self.entry_dates, np.datetime64('NaT'))
+            self.bars_in_stage = np.where(flags, self.bars_in_stage + 1, 0)
+            self.in_stage = flags
+        if len(bars):
+            self.last_date = bars.index[-1]
+        return frames
+
+    # Function to summarise where each ticker stands as of last_date
+    def current(self):
+        entry_dates = pd.DatetimeIndex(self.entry_dates)
+        return pd.DataFrame({
+            'Ticker': self.tickers.astype(str),
+            'In Stage 2': self.in_stage,
+            'Entry Date': entry_dates,
+            'Bars in Stage': self.bars_in_stage,
+            'Days in Stage': np.where(self.in_stage, (self.last_date - entry_dates).days + 1, 0),
+        })
@@ -0,0 +1,172 @@
+import contextvars
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from instrumentation import span
+from price_fetch import fetch_prices
+from stage2 import HISTORY_PERIOD, close_panel, screen_stage2
+
+# Finished screens are kept for JOB_TTL seconds after they complete, and at most
+# MAX_JOBS screens are kept at all (oldest finished ones go first)
+JOB_TTL = 30 * 60
+MAX_JOBS = 16
+
+# Export formats: file extension -> MIME type
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/octet-stream',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+# Stage 2 screen of a ticker list running on a background thread.
+# Tickers are screened batch by batch as their prices arrive, so partial results can be
+# shown while the download runs; when every batch is in, the whole panel is screened
+# once more so the final table does not depend on the order batches completed in.
+class Stage2Job:
+    def __init__(self, tickers, provider=None, period=HISTORY_PERIOD):
+        self.tickers = list(tickers)
+        self.provider = provider
+        self.period = period
+        self.status = 'pending'  # pending -> running -> done | failed
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.completed = 0
+        self.prices = {}
+        self.errors = {}
+        self.panel = None
+        self._partial = []
+        self._results = None
+        self._episodes = None
+        self._exports = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.status = 'running'
+        self.started = time.time()
+        # Timings are recorded into the run that started the screen (see instrumentation)
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), name='stage2-screen', daemon=True)
+        self._thread.start()
+        return self
+
+    def _on_batch(self, batch, batch_prices, batch_errors):
+        partial = screen_stage2(close_panel(batch_prices)) if batch_prices else None
+        with self._lock:
+            self.prices.update(batch_prices)
+            self.errors.update(batch_errors)
+            # Tickers that came back without data are done too
+            self.completed += len(batch)
+            if partial is not None:
+                self._partial.append(partial)
+
+    def _run(self):
+        try:
+            with span('stage2.fetch_prices'):
+                fetch_prices(self.tickers, provider=self.provider, period=self.period, interval='1d',
+                             on_batch=self._on_batch)
+            with span('stage2.screen'):
+                panel = close_panel(self.prices)
+                results = screen_stage2(panel)
+            with self._lock:
+                self.panel = panel
+                self._results = results
+                self.completed = len(self.tickers)
+                self.status = 'done'
+        except Exception as e:
+            with self._lock:
+                self.error = e
+                self.status = 'failed'
+        finally:
+            self.finished = time.time()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    # Function to return the results so far: the final table once done, else the
+    # screened batches that have arrived
+    def results(self):
+        with self._lock:
+            if self._results is not None:
+                return self._results
+            if not self._partial:
+                return screen_stage2(close_panel({}))
+            return pd.concat(self._partial, ignore_index=True)
+
+    # Function to return the Stage 2 entry/exit episodes over the downloaded history,
+    # computed on first request
+    def episodes(self):
+        from stage2_history import stage2_episodes, stage2_history
+
+        if self._episodes is None:
+            if self.panel is None:
+                return None
+            self._episodes = stage2_episodes(stage2_history(self.panel)['Stage 2'])
+        return self._episodes
+
+    # Function to wait for the job to finish (mainly for scripts and batch use)
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    # Function to produce the results as a csv, parquet or xlsx file, on first request only
+    def export(self, fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+        with self._lock:
+            if fmt in self._exports:
+                return self._exports[fmt]
+        results = self.results()
+
+        if fmt == 'csv':
+            data = results.to_csv(index=False).encode('utf-8')
+        else:
+            buffer = io.BytesIO()
+            if fmt == 'parquet':
+                results.to_parquet(buffer, index=False)
+            else:
+                results.to_excel(buffer, index=False, sheet_name='Stage 2')
+            data = buffer.getvalue()
+
+        # Partial results are not worth keeping
+        if self.status == 'done':
+            with self._lock:
+                self._exports[fmt] = data
+        return data
+
+    def expired(self, now=None):
+        return self.finished is not None and (now or time.time()) - self.finished > JOB_TTL
+
+
+# Function to drop expired screens, then the oldest finished ones beyond MAX_JOBS
+def _evict():
+    now = time.time()
+    for key in [key for key, job in _jobs.items() if job.expired(now)]:
+        del _jobs[key]
+    for key in [key for key, job in _jobs.items() if job.done][:max(0, len(_jobs) - MAX_JOBS)]:
+        del _jobs[key]
+
+
+# Function to return the screen of these tickers, starting it in the background unless a
+# running or recently finished one can be reused. Failed screens are retried.
+def start_job(tickers, provider=None, period=HISTORY_PERIOD):
+    key = (tuple(tickers), period, pd.Timestamp.today().date())
+    with _jobs_lock:
+        _evict()
+        job = _jobs.get(key)
+        if job is None or job.status == 'failed':
+            job = Stage2Job(tickers, provider, period).start()
+            _jobs[key] = job
+        _jobs.move_to_end(key)
+        return job
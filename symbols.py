@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, timed
+
+MONTH_CODES = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+# Weekly option expiries encode the month as 1-9, O, N, D (e.g. NIFTY2441118000CE)
+WEEKLY_MONTH_CODES = {str(m): m for m in range(1, 10)}
+WEEKLY_MONTH_CODES.update({'O': 10, 'N': 11, 'D': 12})
+
+INSTRUMENT_TYPES = ['FUT', 'CE', 'PE']
+
+# Weekly expiries are only read for plausible years, from the first weekly options to a few
+# years ahead, so the digits at the end of an underlying (NIFTYNXT50) are not taken as the year
+WEEKLY_YEARS = range(2016, pd.Timestamp.today().year + 6)
+
+_STRIKE_AND_TYPE = r'(?P<strike>\d+(?:\.\d+)?)?(?P<instrument>FUT|CE|PE)$'
+
+# Monthly contract symbol: underlying, two-digit year, month (APR), an optional strike and
+# the instrument type. The underlying is matched greedily so names of any length
+# (M&M, BANKNIFTY, NIFTYNXT50) work; month codes are letters, so the split is unambiguous.
+MONTHLY_PATTERN = (
+    r'^(?P<underlying>.+)(?P<year>\d{2})(?P<month>' + '|'.join(MONTH_CODES) + r')' + _STRIKE_AND_TYPE
+)
+
+# Weekly contract symbol, tried when the monthly one does not match: the expiry is the
+# year, month code and day (24411 = 11 April 2024). The underlying is matched lazily and
+# only splits with a plausible year and a valid day are accepted.
+WEEKLY_PATTERN = (
+    r'^(?P<underlying>.+?)(?P<year>' + '|'.join(f'{year % 100:02d}' for year in WEEKLY_YEARS) + r')'
+    r'(?P<weekly_month>[1-9OND])(?P<day>0[1-9]|[12]\d|3[01])' + _STRIKE_AND_TYPE
+)
+
+COLUMNS = ['Underlying', 'Expiry', 'Strike', 'Instrument']
+
+
+# Function to parse the distinct contract symbols with vectorized regex passes: the monthly
+# format first, then the weekly one for the symbols it did not match
+def _parse_unique(symbols):
+    symbols = pd.Series(symbols, dtype='object').str.strip().str.upper()
+    parts = symbols.str.extract(MONTHLY_PATTERN)
+    weekly = symbols[parts['underlying'].isna()].str.extract(WEEKLY_PATTERN)
+    parts = weekly.combine_first(parts)
+
+    month = parts['month'].map({code: i + 1 for i, code in enumerate(MONTH_CODES)})
+    month = month.fillna(parts['weekly_month'].map(WEEKLY_MONTH_CODES))
+    year = pd.to_numeric(parts['year'], errors='coerce') + 2000
+    expiry = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': 1}), errors='coerce')
+
+    return pd.DataFrame({
+        'Underlying': parts['underlying'],
+        'Expiry': expiry.dt.to_period('M'),
+        'Strike': pd.to_numeric(parts['strike'], errors='coerce'),
+        'Instrument': parts['instrument'],
+    })
+
+
+# Function to parse a column of F&O contract symbols (e.g. NIFTY24APRFUT, BANKNIFTY24MAY48000CE).
+# Returns a DataFrame aligned with the input with categorical Underlying and Instrument
+# (FUT/CE/PE), the expiry month as a Period and the strike (NaN for futures).
+# Each distinct symbol is parsed once, however many trades share it; symbols that do not
+# match the contract format come back as missing values.
+@timed('symbols.parse')
+def parse_symbols(symbols):
+    symbols = pd.Series(symbols)
+    codes, uniques = pd.factorize(symbols)
+    count('symbols.rows', len(symbols))
+    count('symbols.unique', len(uniques))
+    parsed = _parse_unique(np.asarray(uniques, dtype='object'))
+
+    # Broadcast back to every row; missing symbols (code -1) become missing values
+    strike = parsed['Strike'].to_numpy(dtype='float64')
+    return pd.DataFrame({
+        'Underlying': pd.Categorical(parsed['Underlying']).take(codes, allow_fill=True),
+        'Expiry': pd.PeriodIndex(parsed['Expiry'], freq='M').take(codes, allow_fill=True, fill_value=pd.NaT),
+        'Strike': np.where(codes < 0, np.nan, strike[codes] if len(strike) else np.nan),
+        'Instrument': pd.Categorical(parsed['Instrument'], categories=INSTRUMENT_TYPES).take(codes, allow_fill=True),
+    }, index=symbols.index)
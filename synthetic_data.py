@@ -0,0 +1,109 @@
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from symbols import MONTH_CODES
+
+UNDERLYINGS = ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'M&M',
+               'BAJAJ-AUTO', 'SBIN', 'ICICIBANK', 'TATAMOTORS', 'NIFTYNXT50', 'LT', 'ITC']
+
+TRADE_COLUMNS = ['Symbol', 'ISIN', 'Quantity', 'Buy Value', 'Sell Value', 'Realized P&L',
+                 'Realized P&L Pct.', 'Previous Closing Price', 'Open Quantity', 'Open Quantity Type',
+                 'Open Value', 'Unrealized P&L', 'Unrealized P&L Pct.']
+
+# Rows of the F&O sheet layout read by tradebook_loader
+CHARGES_ROW = 18
+TITLE_ROW = 37
+HEADER_ROW = 38
+
+
+# Function to generate a realistic trades DataFrame (FUT, CE and PE contracts over several years)
+def generate_trades(n_trades, n_contracts=2000, start_year=2020, years=4, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Contract universe: underlying, expiry, strike and type
+    underlying = rng.choice(UNDERLYINGS, n_contracts)
+    year = rng.integers(start_year, start_year + years, n_contracts) % 100
+    month = rng.choice(MONTH_CODES, n_contracts)
+    kind = rng.choice(['FUT', 'CE', 'PE'], n_contracts, p=[0.3, 0.35, 0.35])
+    strike = (rng.integers(20, 500, n_contracts) * 100).astype(str)
+    contracts = np.array([
+        f"{u}{y:02d}{m}{'' if k == 'FUT' else s}{k}"
+        for u, y, m, s, k in zip(underlying, year, month, strike, kind)
+    ])
+
+    symbols = contracts[rng.integers(0, n_contracts, n_trades)]
+    quantity = rng.choice([25, 50, 75, 100, 250, 500], n_trades)
+    buy_value = np.round(rng.lognormal(10, 1, n_trades), 2)
+    returns = np.round(np.clip(rng.normal(0.5, 15, n_trades), -99, 500), 2)
+    sell_value = np.round(buy_value * (1 + returns / 100), 2)
+
+    return pd.DataFrame({
+        'Symbol': symbols,
+        'ISIN': '',
+        'Quantity': quantity,
+        'Buy Value': buy_value,
+        'Sell Value': sell_value,
+        'Realized P&L': np.round(sell_value - buy_value, 2),
+        'Realized P&L Pct.': returns,
+        'Previous Closing Price': np.round(rng.uniform(1, 500, n_trades), 2),
+        'Open Quantity': 0,
+        'Open Quantity Type': '',
+        'Open Value': 0.0,
+        'Unrealized P&L': 0.0,
+        'Unrealized P&L Pct.': 0.0,
+    })
+
+
+# Function to compute statement charges for synthetic trades (0.05% of turnover)
+def synthetic_charges(trades):
+    return round(float(trades['Buy Value'].sum() + trades['Sell Value'].sum()) * 0.0005, 2)
+
+
+# Function to write trades into an F&O workbook laid out like the broker statement:
+# summary block with the Charges row, the table title on row 37 and its header on row 38.
+# Data starts in column B. Returns the workbook bytes, or writes them to path.
+def write_workbook(trades, charges=None, path=None):
+    if charges is None:
+        charges = synthetic_charges(trades)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('F&O')
+
+    rows = {
+        1: ['Client ID', 'XX0000'],
+        3: ['P&L Statement for F&O'],
+        15: ['Summary'],
+        CHARGES_ROW: ['Charges', charges],
+        19: ['Other Credit & Debit', 0],
+        20: ['Realized P&L', float(trades['Realized P&L'].sum())],
+        TITLE_ROW: ['Realized Trades'],
+        HEADER_ROW: list(trades.columns),
+    }
+    for row_number in range(1, HEADER_ROW + 1):
+        sheet.append([None] + rows.get(row_number, []))
+    for record in trades.itertuples(index=False, name=None):
+        sheet.append([None, *record])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    data = buffer.getvalue()
+    if path is not None:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return data
+
+
+# Function to generate a wide (dates x tickers) close-price panel of random walks
+def generate_price_panel(n_tickers, n_dates=500, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize()
+    dates = pd.bdate_range(end=end, periods=n_dates)
+    drift = rng.normal(0.0003, 0.0005, n_tickers)
+    log_returns = rng.normal(drift, 0.02, (n_dates, n_tickers))
+    start = rng.uniform(50, 2000, n_tickers)
+    prices = start * np.exp(np.cumsum(log_returns, axis=0))
+    tickers = [f"SYN{i:05d}.NS" for i in range(n_tickers)]
+    return pd.DataFrame(np.round(prices, 2), index=dates, columns=tickers)
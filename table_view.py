@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+FILTER_COLUMNS = ['Underlying', 'Expiry', 'Instrument']
+
+
+# Function to filter trades on the selected values of the filter columns
+# (an empty or missing selection keeps every row)
+def filter_trades(df, selections):
+    mask = np.ones(len(df), dtype=bool)
+    for column, selected in selections.items():
+        if selected and column in df.columns:
+            mask &= df[column].isin(selected).to_numpy()
+    return df[mask] if not mask.all() else df
+
+
+# Function to return the rows of one page, sorting only the row order rather than the frame
+def page_rows(df, page, page_size, sort_column=None, ascending=True):
+    start = (page - 1) * page_size
+    if sort_column is None or sort_column not in df.columns:
+        return df.iloc[start:start + page_size]
+
+    # Sort a positional copy of the one column, then take the page's rows from df
+    values = pd.Series(df[sort_column].array)
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return df.iloc[order[start:start + page_size]]
+
+
+# Function to compute summary statistics of the (filtered) trades
+def summary_stats(df):
+    stats = {'Trades': len(df)}
+    if 'Realized P&L' in df.columns:
+        stats['Realized P&L'] = df['Realized P&L'].sum()
+    if 'Realized P&L Pct.' in df.columns:
+        returns = df['Realized P&L Pct.']
+        stats['Mean P&L Pct.'] = returns.mean()
+        stats['Winning Trades (%)'] = (returns > 0).mean() * 100 if len(df) else np.nan
+    return stats
+
+
+# Function to show a large trade table one page at a time.
+# Filtering, sorting and summary statistics run on the server against df; only the
+# rows of the current page are sent to the browser.
+def paged_table(df, key, page_size=50):
+    filter_columns = [c for c in FILTER_COLUMNS if c in df.columns]
+    selections = {}
+    if filter_columns:
+        columns = st.columns(len(filter_columns))
+        for column, container in zip(filter_columns, columns):
+            options = sorted(df[column].dropna().unique())
+            selections[column] = container.multiselect(
+                column, options, key=f'{key}_filter_{column}', format_func=str
+            )
+    filtered = filter_trades(df, selections)
+
+    sort_col, order_col, size_col = st.columns([2, 1, 1])
+    sort_column = sort_col.selectbox(
+        "Sort by", ['(none)'] + list(df.columns), key=f'{key}_sort'
+    )
+    ascending = order_col.radio(
+        "Order", ["Ascending", "Descending"], key=f'{key}_order', horizontal=True
+    ) == "Ascending"
+    page_size = size_col.selectbox(
+        "Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+        key=f'{key}_page_size',
+    )
+
+    pages = max(1, math.ceil(len(filtered) / page_size))
+    page_key = f'{key}_page'
+    # Filters may have shrunk the table below the selected page
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    rows = page_rows(filtered, int(page), page_size, None if sort_column == '(none)' else sort_column, ascending)
+    st.dataframe(rows)
+
+    first = (int(page) - 1) * page_size
+    st.caption(f"Rows {first + 1 if len(filtered) else 0}-{first + len(rows)} of {len(filtered)} "
+               f"(page {int(page)} of {pages})")
+    st.write(pd.DataFrame([summary_stats(filtered)]))
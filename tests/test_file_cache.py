@@ -0,0 +1,34 @@
+import io
+import os
+import subprocess
+import sys
+
+from file_cache import LRUCache, file_hash, path_hash, read_file_bytes
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c'), len(cache)) == (1, 3, 2)
+
+
+def test_sources_read_and_hash_alike(tmp_path):
+    path = tmp_path / 'file.bin'
+    path.write_bytes(b'trades')
+    assert read_file_bytes(str(path)) == read_file_bytes(io.BytesIO(b'trades')) == b'trades'
+    with open(path, 'rb') as f:
+        f.seek(2)
+        assert read_file_bytes(f) == b'ades' and f.tell() == 2
+    assert path_hash(str(path)) == file_hash(b'trades')
+
+
+def test_portfolio_loader_does_not_import_openpyxl():
+    code = "import sys, portfolio_loader; print('openpyxl' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == 'False'
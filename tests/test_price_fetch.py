@@ -0,0 +1,93 @@
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+from price_fetch import (
+    FixtureProvider, MissingTickersError, PriceProvider, YFinanceProvider, fetch_prices, split_download,
+)
+from synthetic_data import generate_price_panel
+
+
+def _frames(tickers):
+    panel = generate_price_panel(len(tickers), n_dates=30)
+    return {ticker: panel[[column]].set_axis(['Close'], axis=1) for ticker, column in zip(tickers, panel.columns)}
+
+
+# Provider losing the given tickers on its first `failures` calls
+class FlakyProvider(PriceProvider):
+    def __init__(self, frames, flaky, failures=1):
+        self.fixtures = FixtureProvider(frames)
+        self.flaky = set(flaky)
+        self.failures = failures
+        self.requests = []
+
+    def download(self, tickers, **kwargs):
+        self.requests.append(list(tickers))
+        prices = self.fixtures.download(tickers, **kwargs)
+        if len(self.requests) <= self.failures:
+            missing = [ticker for ticker in tickers if ticker in self.flaky]
+            raise MissingTickersError({t: f for t, f in prices.items() if t not in self.flaky},
+                                      {ticker: LookupError(ticker) for ticker in missing})
+        return prices
+
+
+def test_missing_tickers_are_retried():
+    frames = _frames(['A.NS', 'B.NS', 'C.NS'])
+    provider = FlakyProvider(frames, flaky=['B.NS'])
+
+    prices, errors = fetch_prices(list(frames), provider=provider, backoff=0)
+
+    assert set(prices) == set(frames) and not errors
+    assert provider.requests == [['A.NS', 'B.NS', 'C.NS'], ['B.NS']]
+
+
+def test_missing_tickers_are_reported_after_the_last_retry():
+    frames = _frames(['A.NS', 'B.NS'])
+    provider = FlakyProvider(frames, flaky=['B.NS'], failures=10)
+
+    prices, errors = fetch_prices(list(frames), provider=provider, retries=2, backoff=0)
+
+    assert set(prices) == {'A.NS'}
+    assert set(errors) == {'B.NS'}
+    assert len(provider.requests) == 3
+
+
+def test_split_download_maps_upper_cased_columns_back():
+    frames = _frames(['ABC.NS', 'XYZ.NS'])
+    data = pd.concat(frames, axis=1)
+
+    result = split_download(data, ['abc.ns', 'XYZ.NS', 'NONE.NS'])
+
+    assert set(result) == {'abc.ns', 'XYZ.NS'}
+    pd.testing.assert_frame_equal(result['abc.ns'], frames['ABC.NS'])
+
+
+def test_yfinance_provider_reports_tickers_left_out(monkeypatch):
+    frames = _frames(['ABC.NS', 'GONE.NS'])
+    frames['GONE.NS'] = frames['GONE.NS'] * float('nan')
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append((tickers, kwargs))
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setitem(sys.modules, 'yfinance', types.SimpleNamespace(download=download))
+    with pytest.raises(MissingTickersError) as raised:
+        YFinanceProvider().download(['abc.ns', 'gone.ns'], period='1mo')
+
+    assert calls[0][0] == ['ABC.NS', 'GONE.NS']
+    assert 'auto_adjust' not in calls[0][1]
+    assert set(raised.value.prices) == {'abc.ns'}
+    assert set(raised.value.failed) == {'gone.ns'}
+
+
+def test_on_batch_gets_every_requested_ticker():
+    frames = _frames(['A.NS', 'B.NS'])
+    batches = []
+
+    fetch_prices(['A.NS', 'NODATA.NS', 'B.NS'], provider=FixtureProvider(frames), batch_size=2,
+                 on_batch=lambda batch, prices, errors: batches.append((batch, set(prices), set(errors))))
+
+    assert sorted(batches) == [(['A.NS', 'NODATA.NS'], {'A.NS'}, set()), (['B.NS'], {'B.NS'}, set())]
@@ -0,0 +1,94 @@
+import time
+from contextlib import closing
+
+import pytest
+
+from price_fetch import FixtureProvider, MissingTickersError, PriceProvider, fetch_prices
+from price_store import NO_DATA_TTL, PriceStore, StoredPriceProvider
+from synthetic_data import generate_price_panel
+
+
+@pytest.fixture
+def frames():
+    panel = generate_price_panel(3, n_dates=60)
+    return {ticker: panel[[ticker]].set_axis(['Close'], axis=1) for ticker in panel.columns}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / 'prices.sqlite'))
+
+
+# Provider that returns nothing on its first `outages` calls, as yfinance does when offline
+class OutageProvider(PriceProvider):
+    def __init__(self, frames, outages=1):
+        self.fixtures = FixtureProvider(frames)
+        self.outages = outages
+        self.calls = 0
+
+    def download(self, tickers, **kwargs):
+        self.calls += 1
+        if self.calls <= self.outages:
+            return {}
+        return self.fixtures.download(tickers, **kwargs)
+
+
+def _age(store, seconds):
+    with closing(store._connect()) as conn, conn:
+        conn.execute("UPDATE coverage SET fetched_at = fetched_at - ?", (seconds,))
+
+
+def test_outage_is_not_cached(frames, store):
+    upstream = OutageProvider(frames)
+    provider = StoredPriceProvider(upstream, store)
+
+    prices, errors = fetch_prices(list(frames), provider=provider, retries=0)
+    assert not prices and set(errors) == set(frames)
+    assert store.coverage(list(frames)) == {}
+
+    # The same day, the next screen downloads them again
+    prices, errors = fetch_prices(list(frames), provider=provider, retries=0)
+    assert set(prices) == set(frames) and not errors
+    assert upstream.calls == 2
+
+
+def test_outage_is_retried_within_one_fetch(frames, store):
+    upstream = OutageProvider(frames)
+
+    prices, errors = fetch_prices(list(frames), provider=StoredPriceProvider(upstream, store), backoff=0)
+
+    assert set(prices) == set(frames) and not errors
+
+
+def test_cached_tickers_are_served_during_an_outage_and_topped_up_after(frames, store):
+    StoredPriceProvider(FixtureProvider(frames), store).download(list(frames), period='1mo')
+    _age(store, 86400)
+    fetched_at = {ticker: entry[2] for ticker, entry in store.coverage(list(frames)).items()}
+
+    upstream = OutageProvider(frames)
+    provider = StoredPriceProvider(upstream, store)
+    assert set(provider.download(list(frames), period='1mo')) == set(frames)
+    # Still due for a top-up
+    assert {ticker: entry[2] for ticker, entry in store.coverage(list(frames)).items()} == fetched_at
+
+    provider.download(list(frames), period='1mo')
+    assert upstream.calls == 2
+    assert all(entry[2] > max(fetched_at.values()) for entry in store.coverage(list(frames)).values())
+
+
+def test_tickers_without_data_are_cached_briefly(frames, store):
+    upstream = FixtureProvider(frames)
+    provider = StoredPriceProvider(upstream, store)
+    tickers = [*frames, 'NODATA.NS']
+
+    assert set(provider.download(tickers, period='1mo')) == set(frames)
+    provider.download(tickers, period='1mo')
+    assert upstream.calls == 1
+
+    # Asked for on its own, an empty answer cannot be told apart from an outage
+    _age(store, NO_DATA_TTL)
+    with pytest.raises(MissingTickersError) as raised:
+        provider.download(tickers, period='1mo')
+    assert upstream.calls == 2
+    assert set(raised.value.failed) == {'NODATA.NS'}
+    assert set(raised.value.prices) == set(frames)
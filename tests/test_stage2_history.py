@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stage2_history import RESYNC_BARS, Stage2State, stage2_history
+from synthetic_data import generate_price_panel
+
+
+@pytest.fixture(scope='module')
+def panel():
+    panel = generate_price_panel(12, n_dates=700, seed=3)
+    # Tickers listed later: leading gaps ending before, inside and after the update window
+    panel.iloc[:100, 0] = np.nan
+    panel.iloc[:450, 1] = np.nan
+    panel.iloc[:690, 2] = np.nan
+    return panel
+
+
+@pytest.mark.parametrize('k', [1, 30, RESYNC_BARS + 50])
+def test_update_matches_full_history(panel, k):
+    full = stage2_history(panel)
+    state = Stage2State.from_panel(panel.iloc[:-k])
+    frames = state.update(panel.iloc[-k:])
+
+    assert set(frames) == set(full)
+    for name, frame in frames.items():
+        pd.testing.assert_frame_equal(frame, full[name].iloc[-k:], check_freq=False, obj=name)
+
+    expected = Stage2State.from_panel(panel, full).current()
+    pd.testing.assert_frame_equal(state.current(), expected)
+    assert state.last_date == panel.index[-1]
+
+
+def test_update_in_several_steps_past_resync(panel):
+    k = RESYNC_BARS + 50
+    state = Stage2State.from_panel(panel.iloc[:-k])
+    for start in range(len(panel) - k, len(panel), 37):
+        state.update(panel.iloc[start:start + 37])
+
+    expected = Stage2State.from_panel(panel).current()
+    pd.testing.assert_frame_equal(state.current(), expected)
+
+
+def test_update_ignores_bars_already_seen(panel):
+    state = Stage2State.from_panel(panel.iloc[:-5])
+    frames = state.update(panel.iloc[-10:])
+    assert len(frames['Stage 2']) == 5
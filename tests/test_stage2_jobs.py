@@ -0,0 +1,17 @@
+from price_fetch import FixtureProvider, fetch_prices
+from stage2_jobs import Stage2Job
+from synthetic_data import generate_price_panel
+
+
+def test_progress_counts_tickers_without_data():
+    panel = generate_price_panel(3, n_dates=300)
+    provider = FixtureProvider({ticker: panel[[ticker]].set_axis(['Close'], axis=1) for ticker in panel.columns})
+    tickers = [*panel.columns, 'NODATA.NS']
+    job = Stage2Job(tickers, provider=provider)
+
+    # Before the final screen, progress comes from the batches alone
+    fetch_prices(tickers, provider=provider, batch_size=2, on_batch=job._on_batch)
+
+    assert job.completed == len(tickers)
+    assert set(job.prices) == set(panel.columns) and not job.errors
+    assert len(job.results()) == len(panel.columns)
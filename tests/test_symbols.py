@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from symbols import parse_symbols
+
+
+@pytest.mark.parametrize('symbol, underlying, expiry, strike, instrument', [
+    # Monthly
+    ('NIFTY24APRFUT', 'NIFTY', '2024-04', np.nan, 'FUT'),
+    ('BANKNIFTY24MAY48000CE', 'BANKNIFTY', '2024-05', 48000, 'CE'),
+    ('RELIANCE23DEC2450PE', 'RELIANCE', '2023-12', 2450, 'PE'),
+    ('NIFTY24JUN22050.5CE', 'NIFTY', '2024-06', 22050.5, 'CE'),
+    # Weekly: year, month code (1-9, O, N, D) and day
+    ('NIFTY2441118000CE', 'NIFTY', '2024-04', 18000, 'CE'),
+    ('BANKNIFTY24O0948000PE', 'BANKNIFTY', '2024-10', 48000, 'PE'),
+    ('NIFTY24D1222000PE', 'NIFTY', '2024-12', 22000, 'PE'),
+    # Underlyings of odd length or ending in digits
+    ('M&M24MAY1800CE', 'M&M', '2024-05', 1800, 'CE'),
+    ('NIFTYNXT5024APRFUT', 'NIFTYNXT50', '2024-04', np.nan, 'FUT'),
+    ('NIFTYNXT502441165000CE', 'NIFTYNXT50', '2024-04', 65000, 'CE'),
+    ('NIFTYNXT502510965000PE', 'NIFTYNXT50', '2025-01', 65000, 'PE'),
+    (' nifty24aprfut ', 'NIFTY', '2024-04', np.nan, 'FUT'),
+])
+def test_parse_symbol(symbol, underlying, expiry, strike, instrument):
+    parsed = parse_symbols([symbol]).iloc[0]
+
+    assert parsed['Underlying'] == underlying
+    assert parsed['Expiry'] == pd.Period(expiry, freq='M')
+    assert parsed['Strike'] == pytest.approx(strike, nan_ok=True)
+    assert parsed['Instrument'] == instrument
+
+
+def test_unparseable_symbols_are_missing():
+    parsed = parse_symbols(pd.Series(['NIFTY24APR', 'NIFTY24XYZFUT', None, 'NIFTY24APRFUT'], index=[5, 6, 7, 8]))
+
+    assert list(parsed.index) == [5, 6, 7, 8]
+    assert parsed['Underlying'].isna().tolist() == [True, True, True, False]
+    assert parsed['Expiry'].isna().tolist() == [True, True, True, False]
+
+
+def test_repeated_symbols_share_one_parse():
+    parsed = parse_symbols(['NIFTY24APRFUT', 'NIFTY2441118000CE', 'NIFTY24APRFUT'])
+
+    assert parsed['Underlying'].tolist() == ['NIFTY', 'NIFTY', 'NIFTY']
+    assert parsed['Instrument'].tolist() == ['FUT', 'CE', 'FUT']
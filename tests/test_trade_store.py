@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from monthly_returns import aggregate_returns, trade_returns
+from trade_store import TradeStore, trade_keys
+from synthetic_data import generate_trades, write_workbook
+from tradebook_loader import load_tradebook
+
+
+@pytest.fixture
+def statements(tmp_path):
+    trades = generate_trades(3000, seed=5)
+    # The second statement repeats the last 1000 trades of the first
+    paths = [tmp_path / 'first.xlsx', tmp_path / 'second.xlsx']
+    write_workbook(trades.iloc[:2000], path=paths[0])
+    write_workbook(trades.iloc[1000:], path=paths[1])
+    return [str(path) for path in paths]
+
+
+# Function to build the in-memory result: every statement's trades with its charges
+# allocated, keeping the first occurrence of each trade key
+def _expected(statements):
+    frames, returns = [], []
+    for path in statements:
+        charges_value, df = load_tradebook(path)
+        frames.append(df.assign(_key=trade_keys(df)))
+        returns.append(trade_returns(df, charges_value=charges_value))
+    df = pd.concat(frames, ignore_index=True)
+    returns = pd.concat(returns, ignore_index=True)
+    keep = ~df['_key'].duplicated()
+    return df[keep].drop(columns='_key'), returns[keep]
+
+
+def test_ingest_skips_repeated_trades_and_files(tmp_path, statements):
+    store = TradeStore(str(tmp_path / 'trades.sqlite'))
+
+    assert store.ingest(statements[0]) == (2000, False)
+    assert store.ingest(statements[1]) == (1000, False)
+    assert store.ingest(statements[0]) == (0, True)
+    assert store.files()['new_trades'].tolist() == [2000, 1000]
+
+
+def test_trade_keys_tell_repeated_trades_apart():
+    trades = generate_trades(10, seed=1)
+    doubled = pd.concat([trades, trades.iloc[:3]], ignore_index=True)
+
+    keys = trade_keys(doubled)
+    assert len(set(keys)) == len(doubled)
+    np.testing.assert_array_equal(keys[:10], trade_keys(trades))
+
+
+def test_returns_match_in_memory_aggregation(tmp_path, statements):
+    store = TradeStore(str(tmp_path / 'trades.sqlite'))
+    for path in statements:
+        store.ingest(path)
+
+    df, returns = _expected(statements)
+    assert len(df) == 3000
+    assert store.total_charges() == pytest.approx(returns['Charges'].sum())
+
+    # Gross returns match aggregating the deduplicated trades in memory
+    stored, expected = store.returns(), aggregate_returns(df)
+    for category in ['futures', 'options', 'total']:
+        ours, theirs = getattr(stored, category), getattr(expected, category)
+        assert ours.trades == theirs.trades
+        assert ours.trade_gmr == pytest.approx(theirs.trade_gmr)
+        pd.testing.assert_series_equal(ours.monthly, theirs.monthly, check_exact=False)
+
+    # Net returns keep the charges each trade was allocated in the statement it came from
+    net = returns.dropna(subset=['Category', 'Expiry', 'Return'])
+    monthly = net.groupby('Expiry')['Net Return'].mean()
+    monthly = monthly[monthly != 0]
+    monthly.index = pd.PeriodIndex(monthly.index, freq='M')
+    pd.testing.assert_series_equal(stored.net.total.monthly, monthly, check_exact=False, check_names=False)
@@ -0,0 +1,15 @@
+import pandas as pd
+
+from tradebook_schema import apply_schema
+
+
+def test_prices_keep_their_paisa():
+    df = apply_schema(pd.DataFrame({
+        'Symbol': ['NIFTY24APRFUT'],
+        'Quantity': ['1,800'],
+        'Realized P&L Pct.': [1.25],
+        'Previous Closing Price': ['48,123.45'],
+    }))
+
+    assert df['Previous Closing Price'].iloc[0] == 48123.45
+    assert df['Quantity'].dtype == 'float32' and df['Quantity'].iloc[0] == 1800
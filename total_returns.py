@@ -1,37 +1,16 @@
-import pandas as pd
 import streamlit as st
-import numpy as np
-
-# Function to calculate geometric mean
-def geometric_mean(returns):
-    # Convert percentage returns to decimal form
-    returns = returns / 100 + 1
-    # Calculate geometric mean
-    gmr = np.prod(returns) ** (1 / len(returns)) - 1
-    # Convert back to percentage form
-    return gmr * 100
-
-# Function to calculate total returns
-def calculate_total_returns(df, charges_value):
-    # Filter futures and options data
-    futures_df = df[df['Symbol'].str.endswith('FUT')]
-    options_df = df[df['Symbol'].str.endswith(('CE', 'PE'))]
-
-    # Calculate geometric mean for futures
-    futures_gmr = geometric_mean(futures_df['Realized P&L Pct.'])
-
-    # Calculate geometric mean for options
-    options_gmr = geometric_mean(options_df['Realized P&L Pct.'])
-
-    # Calculate combined geometric mean
-    combined_returns = pd.concat([futures_df['Realized P&L Pct.'], options_df['Realized P&L Pct.']])
-    total_geometric_mean = geometric_mean(combined_returns)
-
-    # Create a summary DataFrame
-    summary_df = pd.DataFrame({
-        'Category': ['Futures', 'Options', 'Total'],
-        'Geometric Mean (%)': [futures_gmr, options_gmr, total_geometric_mean]
-    })
+# geometric_mean used to be defined here; re-exported so `from total_returns import geometric_mean` keeps working
+from geometric import geometric_mean  # noqa: F401
+from monthly_returns import aggregate_returns
+
+# Function to calculate total returns, gross and net of charges_value.
+# Pass the shared MonthlyReturns result to reuse it instead of re-aggregating df.
+def calculate_total_returns(df, charges_value, returns=None):
+    if returns is None:
+        returns = aggregate_returns(df, charges_value=charges_value)
+
+    # Summary of the gross and net geometric mean per trade for futures, options and both combined
+    summary_df = returns.summary()
 
     return summary_df
 
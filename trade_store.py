@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from file_cache import file_hash, read_file_bytes
+from monthly_returns import CATEGORIES, merge_groups, summarize_returns, trade_returns
+from symbols import parse_symbols
+from tradebook_loader import load_tradebook
+
+# Location of the local trade warehouse
+STORE_PATH = os.environ.get(
+    'FUTURESROI_TRADE_STORE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'futuresroi', 'trades.sqlite'),
+)
+
+# Trade fields that identify one trade across statements; a trade repeated within a
+# statement is told apart by its occurrence number
+KEY_COLUMNS = ['Symbol', 'Quantity', 'Buy Value', 'Sell Value', 'Realized P&L', 'Realized P&L Pct.']
+
+# Stored columns of the trades table, from the tradebook columns
+TRADE_COLUMNS = {
+    'Symbol': 'symbol',
+    'Quantity': 'quantity',
+    'Buy Value': 'buy_value',
+    'Sell Value': 'sell_value',
+    'Realized P&L': 'realized_pnl',
+    'Realized P&L Pct.': 'realized_pnl_pct',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    hash TEXT PRIMARY KEY,
+    name TEXT,
+    ingested_at REAL NOT NULL,
+    charges REAL,
+    trades INTEGER NOT NULL,
+    new_trades INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    trade_key INTEGER PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    symbol TEXT,
+    underlying TEXT,
+    expiry TEXT,
+    instrument TEXT,
+    category TEXT,
+    quantity REAL, buy_value REAL, sell_value REAL, realized_pnl REAL, realized_pnl_pct REAL,
+    log_growth REAL,
+    total_loss INTEGER,
+    charge REAL,
+    net_return_pct REAL,
+    net_log_growth REAL,
+    net_total_loss INTEGER
+);
+CREATE INDEX IF NOT EXISTS trades_by_month ON trades (category, expiry);
+"""
+
+# Function to compute a stable 64-bit key per trade from its fields and occurrence number
+def trade_keys(df):
+    columns = [c for c in KEY_COLUMNS if c in df.columns]
+    key_frame = df[columns].astype('object').astype(str)
+    key_frame['Occurrence'] = key_frame.groupby(columns, sort=False).cumcount()
+    return pd.util.hash_pandas_object(key_frame, index=False).to_numpy().view(np.int64)
+
+
+# Function to turn a parsed tradebook into rows of the trades table, with the
+# statement's charges allocated across its trades
+def trade_rows(df, file_hash_value, parsed=None, charges_value=None, allocation='turnover'):
+    if parsed is None:
+        parsed = parse_symbols(df['Symbol'])
+    returns = trade_returns(df, parsed, charges_value, allocation)
+
+    rows = pd.DataFrame({
+        'trade_key': trade_keys(df),
+        'file_hash': file_hash_value,
+        'symbol': df['Symbol'].astype('object'),
+        'underlying': parsed['Underlying'].astype('object'),
+        'expiry': parsed['Expiry'].astype('object').map(lambda p: None if pd.isna(p) else str(p)),
+        'instrument': parsed['Instrument'].astype('object'),
+        'category': returns['Category'].astype('object'),
+    }, index=df.index)
+    for column, name in TRADE_COLUMNS.items():
+        if column != 'Symbol':
+            rows[name] = df[column].astype('float64') if column in df.columns else np.nan
+    rows['log_growth'] = returns['Log Growth']
+    rows['total_loss'] = returns['Total Loss'].astype('int64')
+    rows['charge'] = returns['Charges']
+    rows['net_return_pct'] = returns['Net Return']
+    rows['net_log_growth'] = returns['Net Log Growth']
+    rows['net_total_loss'] = returns['Net Total Loss'].astype('int64')
+    # SQLite stores NULL for missing values
+    return rows.astype('object').where(rows.notna(), None)
+
+
+# Append-only SQLite warehouse of realized F&O trades.
+# Files are skipped by content hash and trades deduplicated by trade key, so adding a
+# statement only parses that one file; returns are answered by aggregate queries.
+class TradeStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    # Function to tell whether a file with this content hash was already ingested
+    def has_file(self, hash_value):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM files WHERE hash = ?", (hash_value,)).fetchone() is not None
+
+    # Function to add one tradebook (path, bytes or uploaded file) to the store.
+    # Returns (new_trades, skipped): skipped is True when the same file was ingested before.
+    # allocation is how the statement's charges are split across its trades; tradebook is the
+    # (charges_value, df) of load_tradebook when the caller has already loaded the file.
+    def ingest(self, source, name=None, allocation='turnover', tradebook=None):
+        file_bytes = read_file_bytes(source)
+        hash_value = file_hash(file_bytes)
+        if self.has_file(hash_value):
+            return 0, True
+
+        charges_value, df = tradebook if tradebook is not None else load_tradebook(file_bytes)
+        rows = trade_rows(df, hash_value, charges_value=charges_value, allocation=allocation)
+        if name is None:
+            name = getattr(source, 'name', source if isinstance(source, str) else None)
+
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO trades ({', '.join(rows.columns)}) "
+                f"VALUES ({', '.join('?' * len(rows.columns))})",
+                rows.itertuples(index=False, name=None),
+            )
+            new_trades = conn.total_changes - before
+            conn.execute(
+                "INSERT OR IGNORE INTO files (hash, name, ingested_at, charges, trades, new_trades) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hash_value, name, time.time(), charges_value, len(rows), new_trades),
+            )
+        return new_trades, False
+
+    # Function to list the ingested files, oldest first
+    def files(self):
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT name, hash, ingested_at, charges, trades, new_trades FROM files ORDER BY ingested_at", conn,
+            ).assign(ingested_at=lambda f: pd.to_datetime(f['ingested_at'], unit='s'))
+
+    # Function to return the charges allocated to the stored trades. Charges on trades
+    # deduplicated away from overlapping statements are not counted, so this matches the
+    # net returns.
+    def total_charges(self):
+        with closing(self._connect()) as conn:
+            value = conn.execute("SELECT SUM(charge) FROM trades").fetchone()[0]
+        return value if value is not None else 0.0
+
+    # Function to aggregate the stored trades by (category, expiry month) in SQL.
+    # Same layout as monthly_returns.group_returns.
+    def grouped_returns(self):
+        with closing(self._connect()) as conn:
+            groups = pd.read_sql_query(
+                "SELECT category, expiry, COUNT(*) AS Trades, SUM(realized_pnl_pct) AS Sum, "
+                "SUM(log_growth) AS LogGrowth, SUM(total_loss) AS TotalLoss, "
+                "SUM(charge) AS Charges, SUM(net_return_pct) AS NetSum, "
+                "SUM(net_log_growth) AS NetLogGrowth, SUM(net_total_loss) AS NetTotalLoss FROM trades "
+                "WHERE category IS NOT NULL AND expiry IS NOT NULL AND realized_pnl_pct IS NOT NULL "
+                "GROUP BY category, expiry",
+                conn,
+            )
+        if groups.empty:
+            return merge_groups([])
+
+        index = pd.MultiIndex.from_arrays(
+            [
+                pd.Categorical(groups['category'], categories=CATEGORIES),
+                pd.PeriodIndex(groups['expiry'], freq='M'),
+            ],
+            names=['Category', 'Expiry'],
+        )
+        columns = ['Trades', 'Sum', 'LogGrowth', 'TotalLoss', 'Charges', 'NetSum', 'NetLogGrowth', 'NetTotalLoss']
+        return groups[columns].set_axis(index).sort_index()
+
+    # Function to compute monthly, overall and geometric returns, gross and net of charges,
+    # over every stored trade
+    def returns(self):
+        return summarize_returns(self.grouped_returns())
@@ -0,0 +1,105 @@
+import io
+
+import openpyxl
+import pandas as pd
+
+from file_cache import LRUCache, file_hash, read_file_bytes
+from instrumentation import count, span  # No-op unless FUTURESROI_DEBUG is set
+from tradebook_schema import apply_schema
+
+SHEET_NAME = 'F&O'
+
+# Layout of the F&O sheet: the summary block (with the Charges row) starts
+# after row 13 and the realized trades table starts after row 36
+SUMMARY_START_ROW = 14
+TRADES_START_ROW = 37
+CHARGES_LABEL = 'Charges'
+CHARGES_COLUMN = 2
+
+# Number of parsed workbooks kept in memory
+CACHE_SIZE = 8
+
+_cache = LRUCache(CACHE_SIZE)
+
+
+def _is_blank(row):
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in row)
+
+
+# Function to parse the F&O sheet in a single streaming pass.
+# Returns the charges value (None if the Charges row is missing) and the trades DataFrame.
+# Raises tradebook_schema.SchemaError when trade values do not match the declared schema.
+def parse_tradebook(file_bytes):
+    workbook = openpyxl.load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+    try:
+        sheet = workbook[SHEET_NAME]
+        # Don't trust (or compute) the sheet dimensions: computing them costs a full extra
+        # pass over the XML when the file has none; ragged rows are padded below instead
+        sheet.reset_dimensions()
+
+        charges_value = None
+        header = None
+        records = []
+        row_numbers = []
+
+        for row_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            if row_number < SUMMARY_START_ROW or _is_blank(row):
+                continue
+
+            if charges_value is None and CHARGES_LABEL in row:
+                # The charges value sits in the third column of the Charges row
+                charges_value = row[CHARGES_COLUMN] if len(row) > CHARGES_COLUMN else None
+
+            if row_number < TRADES_START_ROW:
+                continue
+
+            if header is None:
+                # The trades table header is the first row naming the Symbol column
+                if 'Symbol' in row:
+                    header = row
+                continue
+
+            if row == header:
+                # Header repeated further down the sheet
+                continue
+
+            records.append(row)
+            row_numbers.append(row_number)
+    finally:
+        workbook.close()
+
+    if header is None:
+        raise ValueError(f"Trades table not found in the '{SHEET_NAME}' sheet.")
+
+    # Keep only the named columns (the sheet has empty spacer columns)
+    positions = [i for i, name in enumerate(header) if name is not None and str(name).strip()]
+    columns = [str(header[i]).strip() for i in positions]
+    data = {
+        column: pd.Series([row[i] if i < len(row) else None for row in records], dtype='object')
+        for column, i in zip(columns, positions)
+    }
+
+    # Cast to the declared schema (typed numeric, categorical and date columns)
+    df = apply_schema(pd.DataFrame(data), row_numbers)
+    return charges_value, df
+
+
+# Function to load the charges value and trades DataFrame, cached by content hash
+def load_tradebook(source):
+    file_bytes = read_file_bytes(source)
+    key = file_hash(file_bytes)
+    count('tradebook.bytes_read', len(file_bytes))
+
+    entry = _cache.get(key)
+    if entry is not None:
+        count('tradebook.cache_hits')
+    else:
+        count('tradebook.cache_misses')
+        with span('tradebook.parse'):
+            entry = parse_tradebook(file_bytes)
+        count('tradebook.rows_parsed', len(entry[1]))
+        _cache.put(key, entry)
+
+    charges_value, df = entry
+    # Hand out a copy so callers can add columns without touching the cached frame
+    return charges_value, df.copy()
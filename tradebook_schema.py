@@ -0,0 +1,86 @@
+import pandas as pd
+
+# Declared dtypes of the F&O trades table. Money, price and return columns stay float64
+# so values are exact to the paisa; only the quantities are float32.
+NUMERIC_COLUMNS = {
+    'Quantity': 'float32',
+    'Buy Value': 'float64',
+    'Sell Value': 'float64',
+    'Realized P&L': 'float64',
+    'Realized P&L Pct.': 'float64',
+    'Previous Closing Price': 'float64',
+    'Open Quantity': 'float32',
+    'Open Value': 'float64',
+    'Unrealized P&L': 'float64',
+    'Unrealized P&L Pct.': 'float64',
+}
+CATEGORICAL_COLUMNS = ['Symbol', 'ISIN', 'Open Quantity Type']
+DATE_COLUMNS = ['Date', 'Trade Date', 'Expiry Date']
+REQUIRED_COLUMNS = ['Symbol', 'Realized P&L Pct.']
+
+# Offending rows listed per column in error messages
+MAX_REPORTED_ROWS = 10
+
+
+# Raised when the trades table does not match the schema.
+# problems maps column name -> list of offending row numbers.
+class SchemaError(ValueError):
+    def __init__(self, message, problems=None):
+        super().__init__(message)
+        self.problems = problems or {}
+
+
+def _is_empty(values):
+    return values.isna() | (values.astype('object').map(lambda v: isinstance(v, str) and not v.strip()))
+
+
+def _format_rows(rows):
+    shown = ', '.join(str(r) for r in rows[:MAX_REPORTED_ROWS])
+    more = len(rows) - MAX_REPORTED_ROWS
+    return f"{shown} (+{more} more)" if more > 0 else shown
+
+
+# Function to cast a raw trades DataFrame to the declared schema.
+# row_numbers gives the sheet row of each DataFrame row for error messages (defaults to
+# the DataFrame index). Raises SchemaError naming the rows with values that do not convert.
+def apply_schema(df, row_numbers=None):
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise SchemaError(f"Missing required column(s): {', '.join(missing)}", {c: [] for c in missing})
+
+    rows = pd.Index(row_numbers if row_numbers is not None else df.index)
+    df = df.copy()
+    problems = {}
+
+    for column, dtype in NUMERIC_COLUMNS.items():
+        if column not in df.columns:
+            continue
+        raw = df[column]
+        if not pd.api.types.is_numeric_dtype(raw):
+            # Thousands separators in numbers stored as text
+            raw = raw.map(lambda v: v.replace(',', '').strip() if isinstance(v, str) else v)
+        values = pd.to_numeric(raw, errors='coerce')
+        bad = values.isna() & ~_is_empty(raw)
+        if bad.any():
+            problems[column] = list(rows[bad.to_numpy()])
+        df[column] = values.astype(dtype)
+
+    for column in DATE_COLUMNS:
+        if column not in df.columns:
+            continue
+        raw = df[column]
+        values = pd.to_datetime(raw, dayfirst=True, errors='coerce')
+        bad = values.isna() & ~_is_empty(raw)
+        if bad.any():
+            problems[column] = list(rows[bad.to_numpy()])
+        df[column] = values
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(lambda v: v.strip() if isinstance(v, str) else v).astype('category')
+
+    if problems:
+        details = '; '.join(f"'{column}' at row(s) {_format_rows(bad_rows)}" for column, bad_rows in problems.items())
+        raise SchemaError(f"Invalid values in the trades table: {details}", problems)
+
+    return df